@@ -1,124 +1,246 @@
 import streamlit as st
-import requests
-import json
 from datetime import datetime
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
 import os
 from dotenv import load_dotenv
+from weather.breaker import upstream_breaker
+from weather.cache import response_cache
+from weather.client import OpenWeatherClient, transport_from_env
+from weather.figures import memoize_figure, figure_cache
+from weather.geo import coordinate_buckets
+from weather.metrics import start_metrics_dump, start_metrics_server, timed_section, track_rerun
+from weather.prewarm import CachePrewarmer, PREWARM_ENABLED
+from weather.ratelimit import upstream_limiter
+from weather.refresher import BackgroundRefresher
+from weather.singleflight import upstream_flights
+from weather.tracing import current_trace, span, trace_rerun, traced, SpanHistory
+from weather.views import (data_age, humidity_level, icon_url, load_overview, load_report,
+                           pressure_level, visibility_level, wind_level)
 
 # 환경 변수 로드
 load_dotenv()
 
 # OpenWeather API 키 (보안 처리)
-# 환경 변수 또는 Streamlit secrets에서 가져오기
-try:
-    API_KEY = st.secrets["OPENWEATHER_API_KEY"]
-except:
-    API_KEY = os.getenv("OPENWEATHER_API_KEY", "your_api_key_here")
-
-# API 키 유효성 검사
-if API_KEY == "your_api_key_here" or not API_KEY:
-    st.error("⚠️ OpenWeather API 키가 설정되지 않았습니다!")
-    st.markdown("""
-    ### API 키 설정 방법:
-    1. [OpenWeatherMap](https://openweathermap.org/api)에서 무료 API 키를 발급받으세요
-    2. 다음 중 하나의 방법으로 API 키를 설정하세요:
-    
-    **방법 1**: `.env` 파일에 추가
-    ```
-    OPENWEATHER_API_KEY=your_actual_api_key
-    ```
-    
-    **방법 2**: `.streamlit/secrets.toml` 파일에 추가
-    ```
-    OPENWEATHER_API_KEY = "your_actual_api_key"
-    ```
-    """)
-    st.stop()
-BASE_URL = "http://api.openweathermap.org/data/2.5/weather"
-FORECAST_URL = "http://api.openweathermap.org/data/2.5/forecast"
-
-def get_weather_data(city_name):
-    """현재 날씨 데이터를 가져오는 함수"""
+# 환경 변수 또는 Streamlit secrets에서 가져오기 (첫 화면이 그려지기 전에 읽지 않도록 함수로 지연)
+def load_api_key():
+    """OpenWeather API 키를 읽어오는 함수"""
     try:
-        # API 요청 매개변수
-        params = {
-            'q': city_name,
-            'appid': API_KEY,
-            'units': 'metric',  # 섭씨온도
-            'lang': 'kr'        # 한국어
-        }
-        
-        response = requests.get(BASE_URL, params=params)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        st.error(f"날씨 데이터를 가져오는데 실패했습니다: {e}")
-        return None
+        return st.secrets["OPENWEATHER_API_KEY"]
+    except:
+        return os.getenv("OPENWEATHER_API_KEY", "your_api_key_here")
 
-def get_forecast_data(city_name):
-    """5일 예보 데이터를 가져오는 함수"""
-    try:
-        params = {
-            'q': city_name,
-            'appid': API_KEY,
-            'units': 'metric',
-            'lang': 'kr'
-        }
+def require_api_key():
+    """API 키 유효성을 검사하고, 키가 없으면 설정 방법을 안내한 뒤 실행을 멈추는 함수"""
+    api_key = load_api_key()
+    if api_key == "your_api_key_here" or not api_key:
+        st.error("⚠️ OpenWeather API 키가 설정되지 않았습니다!")
+        st.markdown("""
+        ### API 키 설정 방법:
+        1. [OpenWeatherMap](https://openweathermap.org/api)에서 무료 API 키를 발급받으세요
+        2. 다음 중 하나의 방법으로 API 키를 설정하세요:
         
-        response = requests.get(FORECAST_URL, params=params)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        st.error(f"예보 데이터를 가져오는데 실패했습니다: {e}")
+        **방법 1**: `.env` 파일에 추가
+        ```
+        OPENWEATHER_API_KEY=your_actual_api_key
+        ```
+        
+        **방법 2**: `.streamlit/secrets.toml` 파일에 추가
+        ```
+        OPENWEATHER_API_KEY = "your_actual_api_key"
+        ```
+        """)
+        st.stop()
+    return api_key
+
+# 새 세션이 처음 보게 되는 기본 도시와 인기 도시 버튼 (예열 대상)
+DEFAULT_CITIES = ["Seoul"]
+POPULAR_CITIES = {
+    "Seoul": "🇰🇷",
+    "Tokyo": "🇯🇵",
+    "New York": "🇺🇸",
+    "London": "🇬🇧",
+    "Paris": "🇫🇷",
+    "Beijing": "🇨🇳"
+}
+
+@st.cache_resource
+def get_client():
+    """프로세스 전체가 공유하는 OpenWeather 클라이언트를 반환하는 함수"""
+    refresher = BackgroundRefresher(response_cache).start()
+    return OpenWeatherClient(load_api_key(), transport=transport_from_env(), refresher=refresher)
+
+@st.cache_resource
+def get_prewarmer():
+    """기본 도시와 인기 도시의 캐시를 미리 채워두는 스케줄러를 시작하는 함수 (꺼져 있으면 None)"""
+    if not PREWARM_ENABLED:
         return None
+    return CachePrewarmer(get_client(), cities=DEFAULT_CITIES + list(POPULAR_CITIES)).start()
 
-def get_weather_icon_emoji(icon_code):
-    """날씨 아이콘 코드에 따른 이모지 반환"""
-    icon_map = {
-        '01d': '☀️',  # clear sky day
-        '01n': '🌙',  # clear sky night
-        '02d': '⛅',  # few clouds day
-        '02n': '☁️',  # few clouds night
-        '03d': '☁️',  # scattered clouds
-        '03n': '☁️',
-        '04d': '☁️',  # broken clouds
-        '04n': '☁️',
-        '09d': '🌧️',  # shower rain
-        '09n': '🌧️',
-        '10d': '🌦️',  # rain day
-        '10n': '🌧️',  # rain night
-        '11d': '⛈️',  # thunderstorm
-        '11n': '⛈️',
-        '13d': '❄️',  # snow
-        '13n': '❄️',
-        '50d': '🌫️',  # mist
-        '50n': '🌫️'
-    }
-    return icon_map.get(icon_code, '🌤️')
+@st.cache_resource
+def get_metrics_exporter():
+    """지표 HTTP 엔드포인트와 주기적 파일 기록을 (설정되어 있으면) 프로세스당 한 번 시작하는 함수"""
+    return start_metrics_server(), start_metrics_dump()
+
+@traced("fetch")
+def fetch_weather_and_forecast(query):
+    """현재 날씨와 5일 예보를 병렬로 가져와 뷰 모델로 반환하는 함수 (실패한 요청은 오류로 표시)"""
+    report = load_report(get_client(), query)
+    for name, label in (('weather', '날씨'), ('forecast', '예보')):
+        if name in report.errors:
+            st.error(f"{label} 데이터를 가져오는데 실패했습니다: {report.errors[name]}")
+    return report
+
+def display_degraded_notice(*views):
+    """업스트림 장애로 마지막 정상 응답을 보여줄 때 몇 분 전 데이터인지 알리는 함수"""
+    age = data_age(*views)
+    if age is None:
+        return
+    minutes = int(age // 60)
+    age_text = f"{minutes // 60}시간 {minutes % 60}분" if minutes >= 60 else f"{max(minutes, 1)}분"
+    st.warning(f"⚠️ 날씨 서비스에 연결할 수 없어 {age_text} 전에 받은 데이터를 표시합니다. "
+               "서비스가 회복되면 자동으로 최신 정보로 바뀝니다.")
+
+def build_waterfall_figure(spans, total):
+    """이번 재실행의 구간을 시작 시각 순 막대로 그린 폭포 차트를 만드는 함수"""
+    import plotly.graph_objects as go
+    
+    labels = [f"{'　' * item.depth}{item.name} ({index + 1})" for index, item in enumerate(spans)]
+    fig = go.Figure(go.Bar(
+        y=labels,
+        x=[item.duration * 1000 for item in spans],
+        base=[item.start * 1000 for item in spans],
+        orientation='h',
+        marker_color=['#4dabf7' if item.thread == 'MainThread' else '#ffa94d' for item in spans],
+        customdata=[[item.duration * 1000, item.thread] for item in spans],
+        hovertemplate="%{y}<br>%{customdata[0]:.1f}ms (%{customdata[1]})<extra></extra>",
+    ))
+    fig.update_layout(
+        title=f"이번 재실행 구간 (전체 {total * 1000:.0f}ms, 주황색: 병렬 작업 스레드)",
+        xaxis_title="재실행 시작부터 (ms)",
+        yaxis=dict(autorange='reversed'),
+        height=max(240, 28 * len(spans) + 120),
+        margin=dict(l=10, r=10, t=50, b=40),
+    )
+    return fig
+
+def span_history():
+    """이 세션의 최근 재실행 구간 기록을 반환하는 함수"""
+    return st.session_state.setdefault('span_history', SpanHistory())
+
+def display_debug_panel():
+    """캐시/호출 통계, 이번 재실행의 구간 폭포 차트, 세션 구간 백분위수를 표시하는 함수"""
+    st.markdown("---")
+    st.subheader("🐞 디버그 패널")
+    cache_stats = response_cache.stats()
+    st.caption(f"🗄️ 응답 캐시: 적중 {cache_stats['hits']}회 / 오래된 값 {cache_stats['stale_hits']}회 / "
+               f"실패 {cache_stats['misses']}회 "
+               f"(적중률 {cache_stats['hit_ratio']:.0%}, {cache_stats['size']}/{cache_stats['max_entries']}개)")
+    flight_stats = upstream_flights.stats()
+    live_buckets = sum(coordinate_buckets.live_buckets().values())
+    st.caption(f"✈️ 업스트림 호출 {flight_stats['calls']}회, 동시 요청 병합 {flight_stats['coalesced']}회, "
+               f"활성 좌표 칸 {live_buckets}개")
+    figure_stats = figure_cache.stats()
+    st.caption(f"📈 차트 캐시: 재사용 {figure_stats['hits']}회 / 생성 {figure_stats['misses']}회 "
+               f"({figure_stats['size']}/{figure_stats['max_entries']}개)")
+    prewarmer = get_prewarmer()
+    if prewarmer is not None:
+        prewarm_stats = prewarmer.stats()
+        st.caption(f"🔥 예열: 도시 {prewarm_stats['cities']}개, 예열 {prewarm_stats['warmed']}회 / "
+                   f"실패 {prewarm_stats['failures']}회 / 연기 {prewarm_stats['deferred']}회 "
+                   f"(최근 1분 호출 {prewarm_stats['calls_last_minute']}/{prewarm_stats['budget_per_minute']})")
+    if upstream_limiter is not None:
+        budget = upstream_limiter.stats()
+        st.caption(f"🪙 호출 한도: 최근 1분 {budget['used_last_minute']}/{budget['rate_per_minute']}회, "
+                   f"남은 토큰 {budget['available']:g}/{budget['capacity']}개, 대기 {budget['queued']}건 / "
+                   f"재시도 {budget['retries']}회 / 백그라운드 건너뜀 {budget['shed']}회 / 시간 초과 {budget['timed_out']}회")
+    breaker_stats = upstream_breaker.stats()
+    breaker_labels = {'closed': "정상", 'open': f"차단 ({breaker_stats['retry_in']:g}초 후 재시도)", 'half_open': "회복 확인 중"}
+    st.caption(f"🔌 업스트림 회로: {breaker_labels[breaker_stats['state']]}, 연속 실패 {breaker_stats['failures']}회 / "
+               f"차단 {breaker_stats['opened']}번, 보내지 않은 요청 {breaker_stats['rejected']}건")
+    
+    trace = current_trace()
+    spans = trace.finished_spans() if trace is not None else []
+    if spans:
+        st.plotly_chart(build_waterfall_figure(spans, trace.elapsed()), use_container_width=True)
+    
+    history = span_history()
+    if history.reruns:
+        st.caption(f"⏱️ 최근 재실행 {history.reruns}회의 구간별 시간 (같은 구간은 재실행마다 합산, ms)")
+        st.dataframe([
+            {"구간": name, "횟수": row['count'], "p50": round(row['p50'] * 1000, 1),
+             "p90": round(row['p90'] * 1000, 1), "p99": round(row['p99'] * 1000, 1)}
+            for name, row in history.percentiles().items()
+        ], use_container_width=True, hide_index=True)
+
+def pick_place(text, key):
+    """입력한 지명을 검색 색인으로 확정하고, 확정할 수 없으면 추천 목록에서 고르게 하는 함수"""
+    from weather.search import place_index
+    
+    place = place_index.resolve(text)
+    if place is None and text:
+        suggestions = place_index.search(text)
+        if suggestions:
+            # 마지막 항목은 추천을 무시하고 입력한 그대로 검색
+            choice = st.selectbox(
+                "🔎 이런 곳을 찾으시나요?",
+                range(len(suggestions) + 1),
+                format_func=lambda i: suggestions[i].label if i < len(suggestions) else f"✏️ 입력한 그대로 검색: {text}",
+                key=key
+            )
+            if choice < len(suggestions):
+                place = suggestions[choice]
+    return place
 
-def display_current_weather(weather_data):
-    """현재 날씨 정보를 표시하는 함수"""
-    if not weather_data:
+def display_world_overview(cities):
+    """{도시명: 국기} 도시들의 현재 날씨를 한 번의 배치로 가져와 격자로 표시하는 함수"""
+    results = load_overview(get_client(), list(cities))
+    
+    st.markdown("### 🌐 인기 도시 한눈에 보기")
+    columns = st.columns(len(cities))
+    for column, (city, flag) in zip(columns, cities.items()):
+        current = results[city]
+        with column:
+            if isinstance(current, Exception):
+                st.metric(f"{flag} {city}", "-", help=str(current))
+            else:
+                st.metric(f"{flag} {city}", f"{current.temp:.1f}°C")
+                st.caption(f"{current.emoji} {current.description}")
+
+@memoize_figure
+def build_temperature_gauge(temp, feels_like):
+    """현재 온도 게이지 차트를 만드는 함수"""
+    # pandas/plotly는 무거우므로 차트를 그릴 때 처음 불러옴
+    import plotly.graph_objects as go
+
+    fig_temp = go.Figure(go.Indicator(
+        mode = "gauge+number+delta",
+        value = temp,
+        domain = {'x': [0, 1], 'y': [0, 1]},
+        title = {'text': "현재 온도"},
+        delta = {'reference': feels_like, 'suffix': "°C (체감)"},
+        gauge = {
+            'axis': {'range': [-20, 50]},
+            'bar': {'color': "darkblue"},
+            'steps': [
+                {'range': [-20, 0], 'color': "lightblue"},
+                {'range': [0, 20], 'color': "lightgreen"},
+                {'range': [20, 35], 'color': "yellow"},
+                {'range': [35, 50], 'color': "red"}],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': feels_like}}))
+    fig_temp.update_layout(height=300, margin=dict(l=20, r=20, t=40, b=20))
+    
+    return fig_temp
+
+@timed_section("app_advanced", "current_weather")
+@traced("render:current_weather")
+def display_current_weather(current):
+    """현재 날씨(CurrentConditions)를 표시하는 함수"""
+    if not current:
         return
     
-    # 기본 정보 추출
-    city = weather_data['name']
-    country = weather_data['sys']['country']
-    temp = weather_data['main']['temp']
-    feels_like = weather_data['main']['feels_like']
-    humidity = weather_data['main']['humidity']
-    pressure = weather_data['main']['pressure']
-    description = weather_data['weather'][0]['description']
-    icon = weather_data['weather'][0]['icon']
-    wind_speed = weather_data['wind']['speed']
-    visibility = weather_data.get('visibility', 0) / 1000  # km로 변환
-    
-    # 날씨 아이콘 URL과 이모지
-    icon_url = f"http://openweathermap.org/img/wn/{icon}@2x.png"
-    weather_emoji = get_weather_icon_emoji(icon)
+    temp, feels_like = current.temp, current.feels_like
     
     # 현재 시간
     current_time = datetime.now().strftime("%Y년 %m월 %d일 %H:%M")
@@ -128,35 +250,17 @@ def display_current_weather(weather_data):
         col1, col2 = st.columns([3, 1])
         
         with col1:
-            st.markdown(f"## {weather_emoji} {city}, {country}")
+            st.markdown(f"## {current.emoji} {current.city}, {current.country}")
             st.markdown(f"### 🌡️ {temp}°C")
             st.caption(f"업데이트: {current_time}")
             
             # 온도 게이지 차트
-            fig_temp = go.Figure(go.Indicator(
-                mode = "gauge+number+delta",
-                value = temp,
-                domain = {'x': [0, 1], 'y': [0, 1]},
-                title = {'text': "현재 온도"},
-                delta = {'reference': feels_like, 'suffix': "°C (체감)"},
-                gauge = {
-                    'axis': {'range': [-20, 50]},
-                    'bar': {'color': "darkblue"},
-                    'steps': [
-                        {'range': [-20, 0], 'color': "lightblue"},
-                        {'range': [0, 20], 'color': "lightgreen"},
-                        {'range': [20, 35], 'color': "yellow"},
-                        {'range': [35, 50], 'color': "red"}],
-                    'threshold': {
-                        'line': {'color': "red", 'width': 4},
-                        'thickness': 0.75,
-                        'value': feels_like}}))
-            fig_temp.update_layout(height=300, margin=dict(l=20, r=20, t=40, b=20))
+            fig_temp = build_temperature_gauge(temp, feels_like)
             st.plotly_chart(fig_temp, use_container_width=True)
         
         with col2:
-            st.image(icon_url, width=120)
-            st.markdown(f"**{description}**")
+            st.image(icon_url(current.icon), width=120)
+            st.markdown(f"**{current.description}**")
             st.markdown(f"**체감온도:** {feels_like}°C")
     
     # 상세 정보 메트릭
@@ -166,134 +270,138 @@ def display_current_weather(weather_data):
     with col3:
         st.metric(
             label="💧 습도",
-            value=f"{humidity}%",
-            delta=f"{'높음' if humidity > 70 else '보통' if humidity > 40 else '낮음'}"
+            value=f"{current.humidity}%",
+            delta=humidity_level(current.humidity)
         )
     
     with col4:
         st.metric(
             label="🌪️ 풍속",
-            value=f"{wind_speed} m/s",
-            delta=f"{'강함' if wind_speed > 10 else '보통' if wind_speed > 5 else '약함'}"
+            value=f"{current.wind_speed} m/s",
+            delta=wind_level(current.wind_speed)
         )
     
     with col5:
         st.metric(
             label="📊 기압",
-            value=f"{pressure} hPa",
-            delta=f"{'높음' if pressure > 1013 else '보통' if pressure > 1000 else '낮음'}"
+            value=f"{current.pressure} hPa",
+            delta=pressure_level(current.pressure)
         )
     
     with col6:
         st.metric(
             label="👁️ 가시거리",
-            value=f"{visibility:.1f} km",
-            delta=f"{'좋음' if visibility > 10 else '보통' if visibility > 5 else '나쁨'}"
+            value=f"{current.visibility_km:.1f} km" if current.visibility_km is not None else "-",
+            delta=visibility_level(current.visibility_km)
         )
 
-def display_forecast(forecast_data):
-    """5일 예보를 표시하는 함수"""
-    if not forecast_data:
+@memoize_figure
+def build_temperature_figure(forecast):
+    """온도 변화 그래프를 만드는 함수 (forecast: ForecastSummary)"""
+    import plotly.graph_objects as go
+
+    df = forecast.hourly
+    
+    fig_temp = go.Figure()
+    fig_temp.add_trace(go.Scatter(
+        x=df['datetime'], y=df['temp'],
+        mode='lines+markers',
+        name='온도',
+        line=dict(color='#ff6b6b', width=3),
+        marker=dict(size=6)
+    ))
+    fig_temp.add_trace(go.Scatter(
+        x=df['datetime'], y=df['temp_max'],
+        mode='lines',
+        name='최고기온',
+        line=dict(color='#ff9999', width=2, dash='dash')
+    ))
+    fig_temp.add_trace(go.Scatter(
+        x=df['datetime'], y=df['temp_min'],
+        mode='lines',
+        name='최저기온',
+        line=dict(color='#6bb6ff', width=2, dash='dash')
+    ))
+    fig_temp.update_layout(
+        title='온도 변화 (5일간)',
+        xaxis_title='시간',
+        yaxis_title='온도 (°C)',
+        height=400,
+        hovermode='x unified'
+    )
+    
+    return fig_temp
+
+@memoize_figure
+def build_humidity_figure(forecast):
+    """습도 변화 그래프를 만드는 함수 (forecast: ForecastSummary)"""
+    import plotly.express as px
+
+    df = forecast.hourly
+    
+    fig_humidity = px.area(df, x='datetime', y='humidity',
+                          title='습도 변화 (5일간)',
+                          labels={'humidity': '습도 (%)', 'datetime': '시간'})
+    fig_humidity.update_traces(fill='tonexty', fillcolor='rgba(107, 182, 255, 0.3)')
+    fig_humidity.update_layout(height=400)
+    
+    return fig_humidity
+
+@memoize_figure
+def build_wind_figure(forecast):
+    """풍속 변화 그래프를 만드는 함수 (forecast: ForecastSummary)"""
+    import plotly.express as px
+
+    df = forecast.hourly
+    
+    fig_wind = px.bar(df, x='datetime', y='wind_speed',
+                     title='풍속 변화 (5일간)',
+                     labels={'wind_speed': '풍속 (m/s)', 'datetime': '시간'})
+    fig_wind.update_layout(height=400)
+    
+    return fig_wind
+
+@timed_section("app_advanced", "forecast")
+@traced("render:forecast")
+def display_forecast(forecast):
+    """5일 예보(ForecastSummary)를 표시하는 함수"""
+    if not forecast:
         return
     
     st.markdown("## 📅 5일 예보")
     
-    # 예보 데이터 처리
-    forecast_list = []
-    for item in forecast_data['list'][:40]:  # 5일 * 8회 (3시간 간격)
-        date_time = datetime.fromtimestamp(item['dt'])
-        forecast_list.append({
-            'datetime': date_time,
-            'date': date_time.strftime('%m/%d'),
-            'time': date_time.strftime('%H:%M'),
-            'temp': item['main']['temp'],
-            'temp_min': item['main']['temp_min'],
-            'temp_max': item['main']['temp_max'],
-            'humidity': item['main']['humidity'],
-            'description': item['weather'][0]['description'],
-            'icon': item['weather'][0]['icon'],
-            'wind_speed': item['wind']['speed']
-        })
-    
-    # 데이터프레임 생성
-    df = pd.DataFrame(forecast_list)
-    
-    # 탭으로 다양한 차트 표시
+    # 탭으로 다양한 차트 표시 (같은 예보에 대해서는 캐시된 figure 재사용)
     tab1, tab2, tab3 = st.tabs(["🌡️ 온도", "💧 습도", "🌪️ 바람"])
     
     with tab1:
         # 온도 변화 그래프
-        fig_temp = go.Figure()
-        fig_temp.add_trace(go.Scatter(
-            x=df['datetime'], y=df['temp'],
-            mode='lines+markers',
-            name='온도',
-            line=dict(color='#ff6b6b', width=3),
-            marker=dict(size=6)
-        ))
-        fig_temp.add_trace(go.Scatter(
-            x=df['datetime'], y=df['temp_max'],
-            mode='lines',
-            name='최고기온',
-            line=dict(color='#ff9999', width=2, dash='dash')
-        ))
-        fig_temp.add_trace(go.Scatter(
-            x=df['datetime'], y=df['temp_min'],
-            mode='lines',
-            name='최저기온',
-            line=dict(color='#6bb6ff', width=2, dash='dash')
-        ))
-        fig_temp.update_layout(
-            title='온도 변화 (5일간)',
-            xaxis_title='시간',
-            yaxis_title='온도 (°C)',
-            height=400,
-            hovermode='x unified'
-        )
+        fig_temp = build_temperature_figure(forecast)
         st.plotly_chart(fig_temp, use_container_width=True)
     
     with tab2:
         # 습도 변화 그래프
-        fig_humidity = px.area(df, x='datetime', y='humidity',
-                              title='습도 변화 (5일간)',
-                              labels={'humidity': '습도 (%)', 'datetime': '시간'})
-        fig_humidity.update_traces(fill='tonexty', fillcolor='rgba(107, 182, 255, 0.3)')
-        fig_humidity.update_layout(height=400)
+        fig_humidity = build_humidity_figure(forecast)
         st.plotly_chart(fig_humidity, use_container_width=True)
     
     with tab3:
         # 바람 속도 변화 그래프
-        fig_wind = px.bar(df, x='datetime', y='wind_speed',
-                         title='풍속 변화 (5일간)',
-                         labels={'wind_speed': '풍속 (m/s)', 'datetime': '시간'})
-        fig_wind.update_layout(height=400)
+        fig_wind = build_wind_figure(forecast)
         st.plotly_chart(fig_wind, use_container_width=True)
     
     # 일별 예보 요약
     st.markdown("### 📋 일별 요약")
-    daily_forecast = df.groupby('date').agg({
-        'temp': ['min', 'max', 'mean'],
-        'humidity': 'mean',
-        'description': 'first',
-        'icon': 'first'
-    }).reset_index()
-    
-    daily_forecast.columns = ['date', 'min_temp', 'max_temp', 'avg_temp', 'avg_humidity', 'description', 'icon']
     
     # 일별 예보 카드 표시
     cols = st.columns(5)
-    for idx, row in daily_forecast.head(5).iterrows():
+    for idx, day in enumerate(forecast.daily[:5]):
         with cols[idx]:
-            icon_url = f"http://openweathermap.org/img/wn/{row['icon']}@2x.png"
-            weather_emoji = get_weather_icon_emoji(row['icon'])
-            
-            st.markdown(f"### {weather_emoji}")
-            st.image(icon_url, width=60)
-            st.markdown(f"**{row['date']}**")
-            st.markdown(f"🔺 {row['max_temp']:.1f}°C")
-            st.markdown(f"🔻 {row['min_temp']:.1f}°C")
-            st.markdown(f"💧 {row['avg_humidity']:.0f}%")
-            st.caption(f"{row['description']}")
+            st.markdown(f"### {day.emoji}")
+            st.image(icon_url(day.icon), width=60)
+            st.markdown(f"**{day.date} ({day.weekday})**")
+            st.markdown(f"🔺 {day.max_temp:.1f}°C")
+            st.markdown(f"🔻 {day.min_temp:.1f}°C")
+            st.markdown(f"💧 {day.humidity:.0f}%")
+            st.caption(f"{day.description}")
 
 def main():
     """메인 함수"""
@@ -304,6 +412,9 @@ def main():
         layout="wide",
         initial_sidebar_state="expanded"
     )
+    require_api_key()
+    get_prewarmer()
+    get_metrics_exporter()
     
     # 커스텀 CSS
     st.markdown("""
@@ -338,32 +449,30 @@ def main():
     st.markdown("---")
     
     # 사이드바
-    with st.sidebar:
+    with st.sidebar, span("sidebar"):
         st.header("⚙️ 설정")
         
         # 도시 입력
         city_input = st.text_input(
             "🏙️ 도시 이름을 입력하세요:",
             value="Seoul",
-            help="영문 도시명을 입력해주세요 (예: Seoul, Tokyo, New York)"
+            help="한글 또는 영문 도시명을 입력해주세요 (예: 서울, 강남, Tokyo, New York)"
         )
+        place = pick_place(city_input, "place_suggestion")
         
         # 인기 도시 버튼
         st.markdown("#### 🌍 인기 도시")
-        popular_cities = {
-            "Seoul": "🇰🇷",
-            "Tokyo": "🇯🇵", 
-            "New York": "🇺🇸",
-            "London": "🇬🇧",
-            "Paris": "🇫🇷",
-            "Beijing": "🇨🇳"
-        }
+        popular_cities = POPULAR_CITIES
         
         for city, flag in popular_cities.items():
             if st.button(f"{flag} {city}", key=f"city_{city}", use_container_width=True):
                 city_input = city
+                place = None
                 st.rerun()
         
+        show_overview = st.toggle("🌐 인기 도시 한눈에 보기", key="world_overview",
+                                  help="인기 도시들의 현재 날씨를 한 번에 가져와 격자로 보여줍니다")
+        
         st.markdown("---")
         
         # 앱 정보
@@ -381,31 +490,31 @@ def main():
     # 메인 컨텐츠
     if city_input:
         # 로딩 표시
+        # 검색 색인으로 확정한 장소가 있으면 그 위치로, 없으면 입력한 그대로 조회
+        query = place.query if place is not None else {'q': city_input}
         with st.spinner(f"🔍 {city_input}의 날씨 정보를 가져오는 중..."):
-            weather_data = get_weather_data(city_input)
-            forecast_data = get_forecast_data(city_input)
+            report = fetch_weather_and_forecast(query)
         
-        if weather_data and weather_data.get('cod') == 200:
+        if report.current:
+            display_degraded_notice(report.current, report.forecast)
+            
             # 현재 날씨 표시
-            display_current_weather(weather_data)
+            display_current_weather(report.current)
             
             st.markdown("---")
             
             # 5일 예보 표시
-            if forecast_data:
-                display_forecast(forecast_data)
+            if report.forecast:
+                display_forecast(report.forecast)
+            
+            # 인기 도시 현재 날씨 격자
+            if show_overview:
+                st.markdown("---")
+                display_world_overview(popular_cities)
             
-            # 원본 데이터 (개발자용)
-            with st.expander("🔧 원본 데이터 (개발자용)"):
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.subheader("현재 날씨")
-                    st.json(weather_data)
-                with col2:
-                    if forecast_data:
-                        st.subheader("예보 데이터")
-                        st.json(forecast_data)
         
+        elif upstream_breaker.is_open:
+            st.error("❌ 날씨 서비스에 일시적인 장애가 있습니다. 잠시 후 다시 시도해주세요.")
         else:
             st.error("❌ 해당 도시의 날씨 정보를 찾을 수 없습니다.")
             st.info("💡 다음을 확인해주세요:")
@@ -429,6 +538,10 @@ def main():
             </div>
             """, unsafe_allow_html=True)
     
+    # 디버그 패널 (이번 재실행의 구간 폭포 차트와 세션 구간 백분위수)
+    if st.sidebar.toggle("🐞 디버그 패널", key="debug_panel"):
+        display_debug_panel()
+    
     # 푸터
     st.markdown("---")
     st.markdown("""
@@ -439,4 +552,12 @@ def main():
     """, unsafe_allow_html=True)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    
+    # 재실행 시간과 횟수, 활성 세션을 지표로 기록하고 재실행 구간을 추적
+    ctx = get_script_run_ctx()
+    with track_rerun("app_advanced", ctx.session_id if ctx is not None else None), trace_rerun() as trace:
+        try:
+            main()
+        finally:
+            span_history().record(trace)
\ No newline at end of file
@@ -0,0 +1,4 @@
+"""개발용 도구 모음 (스텁 서버, 부하 테스트)
+
+저장소 루트에서 ``python -m tools.<모듈>`` 형태로 실행합니다.
+"""
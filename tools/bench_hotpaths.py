@@ -0,0 +1,296 @@
+"""핫 패스 마이크로벤치마크 (오프라인)
+
+녹화해 둔 현재 날씨/예보 응답(``tools/bench_fixtures/<case>/``)으로 화면을 그리는
+주요 단계의 시간을 측정합니다. 네트워크와 API 키가 필요 없습니다.
+
+- ``parse_ms``   : 예보 응답 → 3시간 간격 데이터프레임 (``parse_forecast``)
+- ``daily_ms``   : 일별 요약 레코드 (``daily_records``)
+- ``figures_ms`` : 앱의 모든 figure 생성 함수 (메모이즈를 거치지 않은 원본 함수)
+- ``figures_json_ms``: 생성한 figure 의 JSON 직렬화 (Streamlit 이 브라우저로 보내는 형태)
+- ``display_current_ms``, ``display_forecast_ms``: Streamlit 헤드리스 하니스에서
+  응답 → 뷰 모델 변환(``weather.views``)과 ``display_current_weather`` / ``display_forecast``
+  전체 렌더링 (figure 캐시를 비운 상태, 즉 위치를 처음 볼 때의 비용)
+
+응답 묶음은 다음 세 가지입니다.
+
+- ``small``       : 예보 8개 (하루치)
+- ``typical``     : 예보 24개 (사흘치)
+- ``pathological``: 예보 40개, 6일에 걸친 자정 경계, ``visibility``/``pop`` 누락,
+  비/눈 필드와 긴 설명 포함
+
+결과(반복 측정의 중앙값)는 ``tools/bench_baseline.json`` 의 기준값과 비교하며, 허용
+비율을 넘게 느려진 항목이 있으면 0이 아닌 종료 코드로 끝납니다. 기계 속도나 부하의
+차이가 회귀로 보이지 않도록, 고정된 보정 작업의 시간 비율만큼 기준값을 늘리거나 줄여서
+비교합니다.
+
+실행 예::
+
+    python -m tools.bench_hotpaths
+    python -m tools.bench_hotpaths --app app_advanced.py --case pathological --repeat 20
+    python -m tools.bench_hotpaths --save          # 현재 결과를 기준값으로 저장
+    python -m tools.bench_hotpaths --regenerate    # 응답 묶음을 다시 만듦
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TOOLS_DIR)
+FIXTURE_DIR = os.path.join(TOOLS_DIR, "bench_fixtures")
+BASELINE_PATH = os.path.join(TOOLS_DIR, "bench_baseline.json")
+CASES = ('small', 'typical', 'pathological')
+APPS = ('app.py', 'app_advanced.py')
+# 응답 묶음을 만들 때 사용하는 고정 시각 (2024-07-01 09:00 KST), 다시 만들어도 같은 내용
+FIXTURE_NOW = 1719792000
+
+# 헤드리스 하니스에서 실행할 스크립트 (앱의 최상위 코드만 실행하고 display_* 를 호출)
+_DISPLAY_SCRIPT = '''
+import json
+import runpy
+import time
+
+import streamlit as st
+
+from weather.figures import figure_cache
+from weather.views import build_current, build_forecast
+
+app = runpy.run_path({app!r}, run_name="bench_hotpaths")
+with open({current!r}, encoding='utf-8') as f:
+    current = json.load(f)
+with open({forecast!r}, encoding='utf-8') as f:
+    forecast = json.load(f)
+figure_cache._entries.clear()
+
+started = time.perf_counter()
+app['display_current_weather'](build_current(current))
+middle = time.perf_counter()
+app['display_forecast'](build_forecast(forecast))
+st.session_state['bench'] = {{
+    'display_current_ms': (middle - started) * 1000,
+    'display_forecast_ms': (time.perf_counter() - middle) * 1000,
+}}
+'''
+
+
+def fixture_paths(case):
+    directory = os.path.join(FIXTURE_DIR, case)
+    return os.path.join(directory, "weather.json"), os.path.join(directory, "forecast.json")
+
+
+def load_fixtures(case):
+    current_path, forecast_path = fixture_paths(case)
+    with open(current_path, encoding='utf-8') as f:
+        current = json.load(f)
+    with open(forecast_path, encoding='utf-8') as f:
+        forecast = json.load(f)
+    return current, forecast
+
+
+def make_fixtures(case):
+    """고정 시각 기준의 (현재 날씨, 예보) 응답 묶음을 만드는 함수"""
+    from tools.stub_server import make_current, make_forecast
+
+    current = make_current("Seoul", 37.5665, 126.978, now=FIXTURE_NOW)
+    items = {'small': 8, 'typical': 24, 'pathological': 40}[case]
+    forecast = make_forecast("Seoul", 37.5665, 126.978, items=items, now=FIXTURE_NOW)
+    if case == 'pathological':
+        # 선택 필드 누락과 비/눈, 긴 설명처럼 드물지만 실제로 오는 응답 모양
+        current.pop('visibility', None)
+        current['rain'] = {'1h': 3.2}
+        for index, item in enumerate(forecast['list']):
+            item.pop('visibility', None)
+            item.pop('pop', None)
+            if index % 3 == 0:
+                item['rain'] = {'3h': round(0.1 * index, 2)}
+            if index % 7 == 0:
+                item['snow'] = {'3h': 0.5}
+                item['weather'] = item['weather'] + [{'id': 600, 'main': 'Snow', 'description': '눈', 'icon': '13n'}]
+            if index % 5 == 0:
+                item['weather'][0] = dict(item['weather'][0], description="천둥번개를 동반한 강한 비와 짙은 안개")
+    return current, forecast
+
+
+def write_fixtures():
+    for case in CASES:
+        current, forecast = make_fixtures(case)
+        for path, payload in zip(fixture_paths(case), (current, forecast)):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False, indent=1)
+                f.write("\n")
+
+
+def time_call(fn, repeat):
+    """fn()을 repeat번 실행한 시간(ms)의 중앙값"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def calibrate(repeat=15):
+    """기계 속도를 나타내는 고정 작업(순수 파이썬 + pandas)의 시간(ms)"""
+    import pandas as pd
+
+    frame = pd.DataFrame({'key': [i % 7 for i in range(2000)], 'value': [float(i) for i in range(2000)]})
+
+    def work():
+        sum(i * i for i in range(100000))
+        frame.groupby('key')['value'].agg(['min', 'max', 'mean'])
+
+    return time_call(work, repeat)
+
+
+def figure_builders(app_namespace):
+    """앱의 figure 생성 함수를 메모이즈를 거치지 않는 원본 함수로 반환"""
+    names = [name for name in app_namespace
+             if name.startswith('build_') and (name.endswith('_figure') or name.endswith('_gauge'))]
+    # 디버그 패널의 폭포 차트는 예보 응답이 아니라 추적 구간을 그리므로 제외
+    return {name: getattr(app_namespace[name], '__wrapped__', app_namespace[name])
+            for name in names if name != 'build_waterfall_figure'}
+
+
+def build_all(builders, current, forecast):
+    figures = []
+    for name, builder in builders.items():
+        if name == 'build_temperature_gauge':
+            figures.append(builder(current.temp, current.feels_like))
+        else:
+            figures.append(builder(forecast))
+    return figures
+
+
+def measure_display(app_path, case, repeat):
+    """헤드리스 하니스에서 display_* 렌더링 시간(ms)의 중앙값을 반환"""
+    from streamlit.testing.v1 import AppTest
+
+    current_path, forecast_path = fixture_paths(case)
+    script = _DISPLAY_SCRIPT.format(app=app_path, current=current_path, forecast=forecast_path)
+    samples = {'display_current_ms': [], 'display_forecast_ms': []}
+    # 첫 실행은 지연 임포트가 섞이므로 버림
+    for index in range(repeat + 1):
+        at = AppTest.from_string(script, default_timeout=60).run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        if index:
+            for metric, value in at.session_state['bench'].items():
+                samples[metric].append(value)
+    return {metric: statistics.median(values) for metric, values in samples.items()}
+
+
+def benchmark(app_path, case, repeat, display_repeat):
+    import runpy
+
+    from weather.forecast import daily_records, parse_forecast
+    from weather.views import build_current, build_forecast
+
+    app = runpy.run_path(app_path, run_name="bench_hotpaths")
+    current, forecast = load_fixtures(case)
+    frame = parse_forecast(forecast)
+    conditions, summary = build_current(current), build_forecast(forecast)
+    builders = figure_builders(app)
+    figures = build_all(builders, conditions, summary)
+
+    result = {
+        'parse_ms': time_call(lambda: parse_forecast(forecast), repeat),
+        'daily_ms': time_call(lambda: daily_records(frame), repeat),
+        'figures_ms': time_call(lambda: build_all(builders, conditions, summary), repeat),
+        'figures_json_ms': time_call(lambda: [figure.to_json() for figure in figures], repeat),
+    }
+    result.update(measure_display(app_path, case, display_repeat))
+    return {metric: round(value, 3) for metric, value in result.items()}
+
+
+def compare(results, baseline, tolerance, scale=1.0):
+    """기준값(scale 배)보다 tolerance 비율 넘게 느려진 항목의 설명 목록"""
+    regressions = []
+    for app, cases in results.items():
+        for case, metrics in cases.items():
+            expected = baseline.get(app, {}).get(case, {})
+            for metric, value in metrics.items():
+                limit = expected.get(metric)
+                if limit is None:
+                    continue
+                limit *= scale
+                if value > limit * (1 + tolerance):
+                    regressions.append(f"{app} {case} {metric}: {value:.2f}ms > 기준 {limit:.2f}ms "
+                                       f"(+{value / limit - 1:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="날씨 앱 핫 패스 마이크로벤치마크")
+    parser.add_argument('--app', action='append', choices=APPS, help="측정할 앱 (여러 번 지정 가능)")
+    parser.add_argument('--case', action='append', choices=CASES, help="응답 묶음 (여러 번 지정 가능)")
+    parser.add_argument('--repeat', type=int, default=15, help="함수 단위 측정 반복 횟수 (중앙값 사용)")
+    parser.add_argument('--display-repeat', type=int, default=5, help="렌더링 측정 반복 횟수")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="기준값 JSON 파일 경로")
+    parser.add_argument('--tolerance', type=float, default=0.5, help="허용하는 느려짐 비율 (0.5 = 50%%)")
+    parser.add_argument('--save', action='store_true', help="결과를 기준값 파일에 저장")
+    parser.add_argument('--regenerate', action='store_true', help="응답 묶음을 다시 만들고 끝냄")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    if args.regenerate:
+        write_fixtures()
+        print(f"응답 묶음을 {FIXTURE_DIR} 에 만들었습니다")
+        return
+
+    # 앱 모듈이 설정을 읽기 전에 오프라인 설정으로 맞춤
+    os.environ.setdefault("OPENWEATHER_API_KEY", "stub")
+    os.environ["WEATHER_TRANSPORT"] = "fixtures"
+    os.environ["WEATHER_CACHE_DB"] = ""
+    os.environ["WEATHER_PREWARM"] = "0"
+    os.chdir(ROOT_DIR)
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+
+    calibration = calibrate()
+    results = {}
+    for app in args.app or APPS:
+        app_path = os.path.join(ROOT_DIR, app)
+        results[app] = {case: benchmark(app_path, case, args.repeat, args.display_repeat)
+                        for case in args.case or CASES}
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    # 기준값을 잰 기계보다 지금 기계가 느리면 그만큼 기준값을 늘려서 비교
+    scale = calibration / baseline['calibration_ms'] if baseline.get('calibration_ms') else 1.0
+    regressions = [] if args.save else compare(results, baseline, args.tolerance, scale)
+
+    if args.json:
+        print(json.dumps({'calibration_ms': round(calibration, 3), 'scale': round(scale, 3),
+                          'results': results, 'regressions': regressions}, ensure_ascii=False, indent=2))
+    else:
+        print(f"보정 작업 {calibration:.2f}ms (기준값 대비 {scale:.2f}배로 비교)")
+        for app, cases in results.items():
+            for case, metrics in cases.items():
+                expected = baseline.get(app, {}).get(case, {})
+                parts = []
+                for metric, value in metrics.items():
+                    ratio = f" ({value / (expected[metric] * scale):.2f}x)" if expected.get(metric) else ""
+                    parts.append(f"{metric[:-3]} {value:.2f}ms{ratio}")
+                print(f"{app} [{case}] " + ", ".join(parts))
+        for regression in regressions:
+            print(f"  느려짐: {regression}")
+
+    if args.save:
+        baseline['calibration_ms'] = round(calibration, 3)
+        for app, cases in results.items():
+            baseline.setdefault(app, {}).update(cases)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"기준값을 {args.baseline} 에 저장했습니다")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
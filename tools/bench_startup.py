@@ -0,0 +1,146 @@
+"""콜드 스타트 벤치마크
+
+오토스케일된 워커가 처음 뜰 때의 비용을 새 파이썬 프로세스에서 측정합니다.
+
+- ``import_ms``      : 앱 스크립트의 최상위 코드(임포트, 함수 정의)를 실행하는 시간
+- ``first_render_ms``: Streamlit 헤드리스 하니스로 첫 화면을 그리는 시간
+  (로컬 스텁 서버 사용, API 할당량을 쓰지 않음)
+- ``heavy_modules``  : 최상위 실행 후 이미 불러와진 무거운 모듈 목록
+
+측정값은 ``tools/startup_budget.json`` 의 예산과 비교하며, 예산을 넘으면
+0이 아닌 종료 코드로 끝나므로 CI에서 그대로 사용할 수 있습니다.
+
+실행 예::
+
+    python -m tools.bench_startup
+    python -m tools.bench_startup --app app_advanced.py --repeat 5 --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+HEAVY_MODULES = ["pandas", "numpy", "plotly.graph_objects", "plotly.express", "weather.forecast",
+                 "weather.regions"]
+
+
+def measure_import(app_path):
+    """앱 스크립트의 최상위 코드만 실행하고 걸린 시간(ms)과 불러온 무거운 모듈을 반환"""
+    import runpy
+
+    started = time.perf_counter()
+    # __main__ 이 아닌 이름으로 실행하므로 main()은 호출되지 않음
+    runpy.run_path(app_path, run_name="bench_startup")
+    elapsed = time.perf_counter() - started
+    return {
+        'import_ms': round(elapsed * 1000, 2),
+        'heavy_modules': [name for name in HEAVY_MODULES if name in sys.modules],
+    }
+
+
+def measure_first_render(app_path):
+    """스텁 서버를 띄우고 첫 화면을 그리는 데 걸린 시간(ms)을 반환"""
+    from tools.stub_server import StubServer
+
+    stub = StubServer(latency_ms=0, jitter_ms=0).start()
+    os.environ["OPENWEATHER_BASE_URL"] = stub.base_url
+    os.environ["IP_LOCATION_URL"] = stub.ip_location_url
+    try:
+        started = time.perf_counter()
+        from streamlit.testing.v1 import AppTest
+
+        at = AppTest.from_file(app_path, default_timeout=60).run()
+        elapsed = time.perf_counter() - started
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+    finally:
+        stub.stop()
+    return {'first_render_ms': round(elapsed * 1000, 2)}
+
+
+def run_child(kind, app_path):
+    """새 프로세스에서 측정 한 번을 실행하고 결과 딕셔너리를 반환"""
+    env = dict(os.environ)
+    env.setdefault("OPENWEATHER_API_KEY", "stub")
+    env["WEATHER_TRANSPORT"] = "http"
+    # 디스크 캐시가 있으면 콜드 스타트가 아니므로 측정 중에는 끔
+    env["WEATHER_CACHE_DB"] = ""
+    output = subprocess.run(
+        [sys.executable, "-m", "tools.bench_startup", "--child", kind, "--app", app_path],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def benchmark(app_path, repeat):
+    """측정을 repeat번 반복하고 중앙값을 반환"""
+    imports = [run_child("import", app_path) for _ in range(repeat)]
+    renders = [run_child("render", app_path) for _ in range(repeat)]
+    return {
+        'app': os.path.basename(app_path),
+        'repeat': repeat,
+        'import_ms': round(statistics.median(r['import_ms'] for r in imports), 2),
+        'first_render_ms': round(statistics.median(r['first_render_ms'] for r in renders), 2),
+        'heavy_modules': imports[-1]['heavy_modules'],
+    }
+
+
+def check_budget(result, budget):
+    """예산을 넘은 항목의 설명 목록을 반환 (비어 있으면 통과)"""
+    limits = budget.get(result['app'], {})
+    violations = []
+    for metric in ('import_ms', 'first_render_ms'):
+        if metric in limits and result[metric] > limits[metric]:
+            violations.append(f"{metric} {result[metric]}ms > 예산 {limits[metric]}ms")
+    for name in budget.get('forbidden_modules', []):
+        if name in result['heavy_modules']:
+            violations.append(f"최상위 실행 중 {name} 모듈을 불러옴")
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="날씨 앱 콜드 스타트 벤치마크")
+    parser.add_argument('--app', action='append', help="측정할 앱 스크립트 (여러 번 지정 가능)")
+    parser.add_argument('--repeat', type=int, default=3, help="측정 반복 횟수 (중앙값 사용)")
+    parser.add_argument('--budget', default=BUDGET_PATH, help="예산 JSON 파일 경로")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON으로 출력")
+    parser.add_argument('--child', choices=['import', 'render'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        app_path = os.path.abspath(args.app[0])
+        measure = measure_import if args.child == 'import' else measure_first_render
+        print(json.dumps(measure(app_path)))
+        return
+
+    with open(args.budget, encoding='utf-8') as f:
+        budget = json.load(f)
+
+    results = []
+    failed = False
+    for app_path in args.app or ['app.py', 'app_advanced.py']:
+        result = benchmark(app_path, args.repeat)
+        result['violations'] = check_budget(result, budget)
+        failed = failed or bool(result['violations'])
+        results.append(result)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        for result in results:
+            status = "초과" if result['violations'] else "통과"
+            print(f"{result['app']}: 최상위 실행 {result['import_ms']}ms, "
+                  f"첫 렌더링 {result['first_render_ms']}ms ({status})")
+            print(f"  불러온 무거운 모듈: {', '.join(result['heavy_modules']) or '없음'}")
+            for violation in result['violations']:
+                print(f"  예산 초과: {violation}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""부하 테스트 드라이버
+
+N개의 동시 세션이 앱의 조회 경로를 반복 실행하고 지연 시간 백분위수(p50/p95/p99)와
+처리량을 보고합니다. 기본적으로 로컬 스텁 서버를 함께 띄우므로 API 할당량을
+사용하지 않습니다.
+
+- ``--mode fetch``: 클라이언트로 현재 날씨 + 예보를 병렬 조회 (main()의 조회 단계)
+- ``--mode app``  : Streamlit 헤드리스 테스트 하니스로 앱 스크립트 전체를 실행
+  (main()의 조회 + 렌더링 전체)
+
+실행 예::
+
+    python -m tools.loadtest --sessions 50 --iterations 20 --latency-ms 80
+    python -m tools.loadtest --mode app --app app_advanced.py --sessions 8 --iterations 3
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tools.stub_server import StubServer
+
+DEFAULT_CITIES = ["Seoul", "Tokyo", "New York", "London", "Paris", "Beijing",
+                  "Busan", "Osaka", "Sydney", "Berlin"]
+
+
+def percentile(sorted_values, pct):
+    """정렬된 값에서 nearest-rank 방식의 백분위수를 구하는 함수"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def pick_city(rng, cities):
+    """인기 도시에 요청이 몰리도록 Zipf 분포로 도시를 고르는 함수"""
+    weights = [1 / (i + 1) for i in range(len(cities))]
+    return rng.choices(cities, weights=weights)[0]
+
+
+def make_fetch_step():
+    """클라이언트 조회 단계를 실행하는 함수를 만듦"""
+    from weather.client import OpenWeatherClient
+
+    client = OpenWeatherClient(os.environ["OPENWEATHER_API_KEY"])
+
+    def step(city):
+        results = client.fetch_many({'weather': ('weather', {'q': city}),
+                                     'forecast': ('forecast', {'q': city})})
+        errors = [r for r in results.values() if isinstance(r, Exception)]
+        if errors:
+            raise errors[0]
+
+    return step
+
+
+def make_app_step(app_path):
+    """Streamlit 헤드리스 하니스로 앱 스크립트 전체를 실행하는 함수를 만듦"""
+    from streamlit import logger
+    from streamlit.runtime.scriptrunner import magic
+    from streamlit.testing.v1 import AppTest
+
+    logger.set_log_level("error")
+
+    # 여러 스레드에서 동시에 ast.parse 를 호출하면 Python 3.11 에서 SystemError 가
+    # 날 수 있으므로 스크립트 컴파일 단계만 직렬화
+    compile_lock = threading.Lock()
+    add_magic = magic.add_magic
+
+    def locked_add_magic(code, script_path):
+        with compile_lock:
+            return add_magic(code, script_path)
+
+    magic.add_magic = locked_add_magic
+    # AppTest는 상대 경로를 호출한 파일 기준으로 해석하므로 절대 경로로 변환
+    app_path = os.path.abspath(app_path)
+
+    def step(city):
+        at = AppTest.from_file(app_path, default_timeout=60).run()
+        # 도시를 직접 입력할 수 있는 화면으로 이동한 뒤 도시명을 입력
+        for selectbox in at.selectbox:
+            overseas = [o for o in selectbox.options if "해외" in o]
+            if overseas:
+                selectbox.select(overseas[0]).run()
+                break
+        if at.text_input:
+            at.text_input[0].set_value(city).run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+
+    return step
+
+
+def run_load(step, sessions, iterations, cities, think_ms=0, seed=0):
+    """세션별 스레드에서 step(city)를 반복 실행하고 지연 시간 목록과 오류 수를 반환"""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def session(index):
+        rng = random.Random(seed + index)
+        for _ in range(iterations):
+            city = pick_city(rng, cities)
+            started = time.perf_counter()
+            try:
+                step(city)
+            except Exception as e:
+                with lock:
+                    errors.append(repr(e))
+            else:
+                with lock:
+                    latencies.append(time.perf_counter() - started)
+            if think_ms:
+                time.sleep(think_ms / 1000 * rng.uniform(0.5, 1.5))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        list(executor.map(session, range(sessions)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def summarize(latencies, errors, elapsed):
+    """지연 시간 백분위수(ms)와 처리량 요약"""
+    values = sorted(latencies)
+    total = len(values) + len(errors)
+    return {
+        'requests': total,
+        'errors': len(errors),
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(total / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(values, 50) * 1000, 2),
+        'p95_ms': round(percentile(values, 95) * 1000, 2),
+        'p99_ms': round(percentile(values, 99) * 1000, 2),
+        'max_ms': round(values[-1] * 1000, 2) if values else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="날씨 앱 부하 테스트")
+    parser.add_argument('--mode', choices=['fetch', 'app'], default='fetch')
+    parser.add_argument('--app', default='app.py', help="--mode app 에서 실행할 앱 스크립트")
+    parser.add_argument('--sessions', type=int, default=20, help="동시 세션 수")
+    parser.add_argument('--iterations', type=int, default=10, help="세션당 반복 횟수")
+    parser.add_argument('--think-ms', type=float, default=0, help="반복 사이 대기 시간 (ms)")
+    parser.add_argument('--cities', default=",".join(DEFAULT_CITIES), help="쉼표로 구분한 도시 목록")
+    parser.add_argument('--no-cache', action='store_true', help="응답 캐시 없이 실행 (TTL 0)")
+    parser.add_argument('--base-url', help="이미 실행 중인 스텁/API 주소 (지정하면 스텁을 띄우지 않음)")
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--jitter-ms', type=float, default=20)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--forecast-items', type=int, default=40)
+    parser.add_argument('--pad-bytes', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    stub = None
+    if args.base_url:
+        os.environ["OPENWEATHER_BASE_URL"] = args.base_url
+    else:
+        stub = StubServer(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                          forecast_items=args.forecast_items, pad_bytes=args.pad_bytes).start()
+        os.environ["OPENWEATHER_BASE_URL"] = stub.base_url
+        os.environ["IP_LOCATION_URL"] = stub.ip_location_url
+        # 스텁 서버에는 호출 한도가 없으므로 업스트림 제한기를 끄고 앱 자체의 처리량을 측정
+        os.environ["WEATHER_UPSTREAM_RATE_PER_MINUTE"] = "0"
+    os.environ.setdefault("OPENWEATHER_API_KEY", "stub")
+    os.environ["WEATHER_TRANSPORT"] = "http"
+    # 예열 스케줄러의 호출이 업스트림 요청 수에 섞이지 않도록 끔
+    os.environ["WEATHER_PREWARM"] = "0"
+    if args.no_cache:
+        os.environ["WEATHER_CACHE_TTL_WEATHER"] = "0"
+        os.environ["WEATHER_CACHE_TTL_FORECAST"] = "0"
+
+    step = make_fetch_step() if args.mode == 'fetch' else make_app_step(args.app)
+    cities = [c.strip() for c in args.cities.split(",") if c.strip()]
+    latencies, errors, elapsed = run_load(step, args.sessions, args.iterations, cities, args.think_ms)
+
+    result = summarize(latencies, errors, elapsed)
+    result.update(mode=args.mode, sessions=args.sessions, iterations=args.iterations)
+    from weather.singleflight import upstream_flights
+    result['single_flight'] = upstream_flights.stats()
+    if stub is not None:
+        result['upstream_requests'] = stub.stats()
+        stub.stop()
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(f"모드: {result['mode']}  세션: {args.sessions}  반복: {args.iterations}")
+        print(f"요청 {result['requests']}건, 오류 {result['errors']}건, {result['elapsed_s']}초, "
+              f"{result['throughput_rps']} req/s")
+        print(f"지연 시간 p50 {result['p50_ms']}ms / p95 {result['p95_ms']}ms / "
+              f"p99 {result['p99_ms']}ms / 최대 {result['max_ms']}ms")
+        print(f"동시 요청 병합: {result['single_flight']['coalesced']}회 "
+              f"(실제 호출 {result['single_flight']['calls']}회)")
+        if 'upstream_requests' in result:
+            print(f"업스트림 요청: {result['upstream_requests']}")
+        for error in sorted(set(errors))[:5]:
+            print(f"  오류: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""OpenWeather / ip-api 로컬 스텁 서버
+
+실제 API 할당량을 쓰지 않고 부하 테스트를 할 수 있도록 앱이 사용하는 응답 형태를
+흉내 냅니다. 지연 시간, 오류 비율, 응답 크기를 조절할 수 있습니다.
+
+- ``/data/2.5/weather``  : 현재 날씨 (q 또는 lat/lon)
+- ``/data/2.5/forecast`` : 5일 예보 (3시간 간격)
+- ``/data/2.5/group``    : 여러 도시의 현재 날씨 (id=쉼표로 구분한 도시 ID)
+- ``/json/``, ``/json/<ip>`` : ip-api.com 위치 응답
+- ``/__stats``           : 경로별 요청 수
+
+실행 예::
+
+    python -m tools.stub_server --port 8081 --latency-ms 80 --error-rate 0.02
+
+앱을 스텁 서버에 연결하려면 다음 환경 변수를 설정합니다::
+
+    OPENWEATHER_BASE_URL=http://127.0.0.1:8081/data/2.5
+    IP_LOCATION_URL=http://127.0.0.1:8081/json/
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+# 스텁 응답에 사용할 날씨 상태 (id, main, description, icon)
+CONDITIONS = [
+    (800, "Clear", "맑음", "01"),
+    (801, "Clouds", "구름 조금", "02"),
+    (802, "Clouds", "구름 많음", "03"),
+    (804, "Clouds", "흐림", "04"),
+    (500, "Rain", "약한 비", "10"),
+    (600, "Snow", "눈", "13"),
+    (701, "Mist", "박무", "50"),
+]
+
+
+def _seed(text):
+    """같은 위치에는 항상 같은 값을 돌려주기 위한 시드"""
+    return zlib.crc32(str(text).encode('utf-8'))
+
+
+def _coords_for(name):
+    """도시명으로부터 결정적인 가짜 좌표를 만드는 함수"""
+    rng = random.Random(_seed(name))
+    return round(rng.uniform(-60, 70), 4), round(rng.uniform(-180, 180), 4)
+
+
+def _condition(rng, hour):
+    weather_id, main, description, icon = rng.choice(CONDITIONS)
+    suffix = 'd' if 6 <= hour < 18 else 'n'
+    return {'id': weather_id, 'main': main, 'description': description, 'icon': icon + suffix}
+
+
+def make_current(name, lat, lon, now=None, pad_bytes=0):
+    """/data/2.5/weather 형태의 응답을 만드는 함수"""
+    now = int(now or time.time())
+    rng = random.Random(_seed(name) + now // 600)
+    temp = round(rng.uniform(-10, 35), 2)
+    payload = {
+        'coord': {'lon': lon, 'lat': lat},
+        'weather': [_condition(rng, time.gmtime(now).tm_hour)],
+        'base': 'stations',
+        'main': {
+            'temp': temp,
+            'feels_like': round(temp - rng.uniform(0, 3), 2),
+            'temp_min': round(temp - rng.uniform(0, 4), 2),
+            'temp_max': round(temp + rng.uniform(0, 4), 2),
+            'pressure': rng.randint(990, 1035),
+            'humidity': rng.randint(20, 100),
+        },
+        'visibility': rng.choice([10000, 8000, 5000, 2000]),
+        'wind': {'speed': round(rng.uniform(0, 15), 2), 'deg': rng.randint(0, 359)},
+        'clouds': {'all': rng.randint(0, 100)},
+        'dt': now,
+        'sys': {'country': 'KR', 'sunrise': now - 6 * 3600, 'sunset': now + 6 * 3600},
+        'timezone': 32400,
+        'id': _seed(name) % 10000000,
+        'name': name,
+        'cod': 200,
+    }
+    if pad_bytes:
+        payload['_pad'] = 'x' * pad_bytes
+    return payload
+
+
+def make_forecast(name, lat, lon, items=40, now=None, pad_bytes=0):
+    """/data/2.5/forecast 형태의 응답을 만드는 함수 (3시간 간격 items개)"""
+    now = int(now or time.time())
+    start = now - now % 10800 + 10800
+    rng = random.Random(_seed(name) + now // 3600)
+    base = rng.uniform(-5, 30)
+    entries = []
+    for i in range(items):
+        dt = start + i * 10800
+        temp = round(base + 5 * rng.uniform(-1, 1), 2)
+        entries.append({
+            'dt': dt,
+            'main': {
+                'temp': temp,
+                'feels_like': round(temp - 1, 2),
+                'temp_min': round(temp - rng.uniform(0, 2), 2),
+                'temp_max': round(temp + rng.uniform(0, 2), 2),
+                'pressure': rng.randint(990, 1035),
+                'humidity': rng.randint(20, 100),
+            },
+            'weather': [_condition(rng, time.gmtime(dt).tm_hour)],
+            'clouds': {'all': rng.randint(0, 100)},
+            'wind': {'speed': round(rng.uniform(0, 15), 2), 'deg': rng.randint(0, 359)},
+            'visibility': 10000,
+            'pop': round(rng.random(), 2),
+            'dt_txt': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(dt)),
+        })
+    payload = {
+        'cod': '200',
+        'message': 0,
+        'cnt': items,
+        'list': entries,
+        'city': {
+            'id': _seed(name) % 10000000,
+            'name': name,
+            'coord': {'lat': lat, 'lon': lon},
+            'country': 'KR',
+            'timezone': 32400,
+            'sunrise': now - 6 * 3600,
+            'sunset': now + 6 * 3600,
+        },
+    }
+    if pad_bytes:
+        payload['_pad'] = 'x' * pad_bytes
+    return payload
+
+
+def make_location(ip=''):
+    """ip-api.com /json/ 형태의 응답을 만드는 함수"""
+    rng = random.Random(_seed(ip))
+    city = rng.choice(["Seoul", "Busan", "Incheon", "Daegu", "Daejeon", "Gwangju"])
+    lat, lon = _coords_for(city)
+    return {
+        'status': 'success',
+        'country': 'South Korea',
+        'countryCode': 'KR',
+        'regionName': city,
+        'city': city,
+        'lat': lat,
+        'lon': lon,
+        'timezone': 'Asia/Seoul',
+        'query': ip or '127.0.0.1',
+    }
+
+
+class StubServer:
+    """백그라운드 스레드에서 동작하는 스텁 HTTP 서버"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=0, jitter_ms=0,
+                 error_rate=0.0, error_status=503, forecast_items=40, pad_bytes=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.forecast_items = forecast_items
+        self.pad_bytes = pad_bytes
+        self.request_counts = Counter()
+        self._counts_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self):
+        """OPENWEATHER_BASE_URL 로 사용할 주소"""
+        return f"{self.url}/data/2.5"
+
+    @property
+    def ip_location_url(self):
+        """IP_LOCATION_URL 로 사용할 주소"""
+        return f"{self.url}/json/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="stub-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def stats(self):
+        with self._counts_lock:
+            return dict(self.request_counts)
+
+    def respond(self, path, query):
+        """경로와 쿼리에 대한 (상태 코드, 응답 본문) 반환"""
+        if path == '/__stats':
+            return 200, self.stats()
+
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if self.error_rate and random.random() < self.error_rate:
+            return self.error_status, {'cod': self.error_status, 'message': 'stub error'}
+
+        if path.startswith('/json'):
+            return 200, make_location(path[len('/json'):].strip('/'))
+
+        if path in ('/data/2.5/weather', '/data/2.5/forecast'):
+            if 'q' in query:
+                name = query['q']
+                lat, lon = _coords_for(name)
+            elif 'lat' in query and 'lon' in query:
+                lat, lon = float(query['lat']), float(query['lon'])
+                name = f"Stub {lat:.2f},{lon:.2f}"
+            else:
+                return 400, {'cod': '400', 'message': 'Nothing to geocode'}
+            if path.endswith('weather'):
+                return 200, make_current(name, lat, lon, pad_bytes=self.pad_bytes)
+            return 200, make_forecast(name, lat, lon, items=self.forecast_items, pad_bytes=self.pad_bytes)
+
+        if path == '/data/2.5/group':
+            from weather.cities import CITY_IDS
+
+            names_by_id = {city_id: name for name, city_id in CITY_IDS.items()}
+            items = []
+            for city_id in query.get('id', '').split(','):
+                if not city_id.strip().isdigit():
+                    continue
+                name = names_by_id.get(int(city_id), f"City {city_id}")
+                item = make_current(name, *_coords_for(name), pad_bytes=self.pad_bytes)
+                item['id'] = int(city_id)
+                del item['cod']
+                items.append(item)
+            return 200, {'cnt': len(items), 'list': items}
+
+        return 404, {'cod': '404', 'message': 'Internal error'}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+                with server._counts_lock:
+                    server.request_counts[parts.path] += 1
+                status, payload = server.respond(parts.path, query)
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenWeather / ip-api 로컬 스텁 서버")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency-ms', type=float, default=0, help="평균 응답 지연 (ms)")
+    parser.add_argument('--jitter-ms', type=float, default=0, help="지연 시간 변동 폭 (ms)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="오류 응답 비율 (0~1)")
+    parser.add_argument('--error-status', type=int, default=503, help="오류 응답 상태 코드")
+    parser.add_argument('--forecast-items', type=int, default=40, help="예보 항목 수")
+    parser.add_argument('--pad-bytes', type=int, default=0, help="응답에 덧붙일 여분 바이트")
+    args = parser.parse_args()
+
+    server = StubServer(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate,
+                        args.error_status, args.forecast_items, args.pad_bytes).start()
+    print(f"스텁 서버 실행 중: {server.url}")
+    print(f"  OPENWEATHER_BASE_URL={server.base_url}")
+    print(f"  IP_LOCATION_URL={server.ip_location_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
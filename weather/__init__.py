@@ -0,0 +1,4 @@
+"""날씨 앱 공용 데이터 계층
+
+Streamlit 앱(app.py, app_advanced.py)이 함께 사용하는 모듈 모음입니다.
+"""
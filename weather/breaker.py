@@ -0,0 +1,197 @@
+"""업스트림 회로 차단기와 마지막 정상 응답 보관소
+
+OpenWeather 가 느려지거나 멈추면 모든 세션이 같은 실패 요청을 반복하면서 시간과
+호출 한도를 낭비합니다. 회로 차단기는 연속 실패가 쌓이면 열려서(OPEN) 한동안
+업스트림을 호출하지 않고 바로 실패하며, 대기 시간이 지나면 반열림(HALF_OPEN) 상태에서
+시험 요청 몇 개만 보내 회복 여부를 확인합니다.
+
+회로가 열려 있는 동안 클라이언트는 ``LastKnownGood`` 에 보관된 위치별 마지막 정상
+응답을 대신 돌려주고, 앱은 응답의 ``fetched_at`` 으로 몇 분 전 데이터인지 표시합니다.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+
+from weather.ratelimit import RateLimitedError
+
+# 회로를 여는 연속 실패 수 (0 이면 끔), 처음 열려 있는 시간과 최대 시간 (초), 반열림 시험 요청 수
+BREAKER_THRESHOLD = int(os.getenv("WEATHER_BREAKER_THRESHOLD", 5))
+BREAKER_RESET = float(os.getenv("WEATHER_BREAKER_RESET", 30))
+BREAKER_MAX_RESET = float(os.getenv("WEATHER_BREAKER_MAX_RESET", 5 * 60))
+BREAKER_PROBES = int(os.getenv("WEATHER_BREAKER_PROBES", 1))
+# 마지막 정상 응답을 보관할 최대 위치 수
+LAST_GOOD_SIZE = int(os.getenv("WEATHER_LAST_GOOD_SIZE", 1024))
+
+# 회로 상태
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """회로가 열려 있어서 업스트림 요청을 보내지 않았을 때 발생하는 예외"""
+
+
+def is_upstream_failure(error):
+    """업스트림 장애로 볼 예외인지 판정 (연결 실패, 시간 초과, 5xx)
+
+    도시를 찾을 수 없음(404) 같은 4xx 응답과 자체 호출 한도 초과는 업스트림이
+    정상적으로 응답한 것이므로 실패로 세지 않습니다.
+    """
+    if isinstance(error, (RateLimitedError, CircuitOpenError)):
+        return False
+    if isinstance(error, requests.exceptions.HTTPError):
+        return error.response is None or error.response.status_code >= 500
+    return isinstance(error, requests.exceptions.RequestException)
+
+
+class CircuitBreaker:
+    """연속 실패 수로 열리고, 반열림 시험 요청으로 닫히는 스레드 안전한 회로 차단기"""
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, reset_timeout=BREAKER_RESET,
+                 max_reset_timeout=BREAKER_MAX_RESET, probes=BREAKER_PROBES):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.probes = probes
+        self.state = CLOSED
+        self.failures = 0       # 연속 실패 수
+        self.opened = 0         # 회로가 열린 횟수
+        self.rejected = 0       # 열려 있어서 보내지 않은 요청 수
+        self._open_for = reset_timeout
+        self._opened_at = 0.0
+        self._probing = 0
+        self._lock = threading.Lock()
+
+    def _before(self):
+        """요청을 보내도 되는지 확인하고, 반열림 상태면 시험 요청 자리를 잡음"""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self._open_for:
+                    self.rejected += 1
+                    raise CircuitOpenError("날씨 서비스 장애로 잠시 요청을 보내지 않습니다")
+                self.state = HALF_OPEN
+                self._probing = 0
+            if self.state == HALF_OPEN:
+                if self._probing >= self.probes:
+                    self.rejected += 1
+                    raise CircuitOpenError("날씨 서비스 회복 여부를 확인하는 중입니다")
+                self._probing += 1
+                return True
+            return False
+
+    def _after(self, probe, failed):
+        """요청 결과 기록 (failed: True 실패, False 성공, None 판정하지 않음)"""
+        with self._lock:
+            if probe:
+                self._probing -= 1
+            if failed is None:
+                return
+            if not failed:
+                self.failures = 0
+                if self.state == HALF_OPEN:
+                    self.state = CLOSED
+                    self._open_for = self.reset_timeout
+                return
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                # 시험 요청이 실패하면 더 오래 열어둠
+                self._open(min(self._open_for * 2, self.max_reset_timeout))
+            elif self.state == CLOSED and self.failures >= self.threshold:
+                self._open(self.reset_timeout)
+
+    def _open(self, duration):
+        self.state = OPEN
+        self.opened += 1
+        self._open_for = duration
+        self._opened_at = time.monotonic()
+
+    def call(self, fn):
+        """회로 상태를 확인한 뒤 fn()을 호출하고 결과를 기록 (열려 있으면 CircuitOpenError)"""
+        if self.threshold <= 0:
+            return fn()
+        probe = self._before()
+        try:
+            result = fn()
+        except Exception as e:
+            self._after(probe, True if is_upstream_failure(e) else None)
+            raise
+        self._after(probe, False)
+        return result
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return self.state != CLOSED
+
+    def stats(self):
+        with self._lock:
+            retry_in = self._open_for - (time.monotonic() - self._opened_at) if self.state == OPEN else 0
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'opened': self.opened,
+                'rejected': self.rejected,
+                'retry_in': max(0.0, round(retry_in, 1)),
+            }
+
+
+class StalePayload(dict):
+    """업스트림 대신 돌려주는 마지막 정상 응답 (fetched_at: 원래 가져온 시각)"""
+
+    def __init__(self, value, fetched_at):
+        super().__init__(value)
+        self.fetched_at = fetched_at
+
+    @property
+    def age(self):
+        return time.time() - self.fetched_at
+
+
+def payload_age(payload):
+    """마지막 정상 응답이면 몇 초 전 데이터인지, 아니면 None"""
+    return payload.age if isinstance(payload, StalePayload) else None
+
+
+class LastKnownGood:
+    """캐시 키별 마지막 정상 응답을 TTL 없이 보관하는 LRU"""
+
+    def __init__(self, max_entries=LAST_GOOD_SIZE):
+        self.max_entries = max_entries
+        self.served = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def set(self, key, value, fetched_at=None):
+        with self._lock:
+            self._entries[key] = (value, time.time() if fetched_at is None else fetched_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key):
+        """보관된 응답을 StalePayload 로 반환 (없으면 None)
+
+        같은 항목에는 같은 객체를 돌려주므로 응답 객체별 계산 결과 캐시가 그대로 동작합니다.
+        """
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, fetched_at = item
+            if not isinstance(value, StalePayload):
+                value = StalePayload(value, fetched_at)
+                self._entries[key] = (value, fetched_at)
+            self.served += 1
+            return value
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# 프로세스 전체가 공유하는 OpenWeather 회로 차단기와 마지막 정상 응답
+upstream_breaker = CircuitBreaker()
+last_known_good = LastKnownGood()
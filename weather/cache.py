@@ -0,0 +1,248 @@
+"""프로세스 전역 TTL + LRU 응답 캐시
+
+Streamlit은 요청마다 앱 스크립트를 다시 실행하지만, import된 모듈은 프로세스당
+한 번만 로드됩니다. 따라서 이 모듈의 ``response_cache`` 는 모든 사용자 세션이
+공유하며, 같은 도시를 보는 사용자가 많아도 TTL마다 한 번만 API를 호출합니다.
+
+``WEATHER_CACHE_DB`` 를 지정하면 메모리 캐시 아래에 SQLite 영구 저장소를 두어
+재시작 후에도 캐시가 유지되고, 부팅 시 저장된 응답으로 메모리 캐시를 예열합니다.
+영구 저장소는 보조 계층이므로 읽기/쓰기 오류(잠금, 디스크 부족)는 기록만 하고 메모리
+캐시로 계속 동작합니다.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# 엔드포인트별 기본 TTL (초)
+DEFAULT_TTLS = {
+    'weather': int(os.getenv("WEATHER_CACHE_TTL_WEATHER", 10 * 60)),    # 현재 날씨: 10분
+    'forecast': int(os.getenv("WEATHER_CACHE_TTL_FORECAST", 60 * 60)),  # 5일 예보: 60분
+}
+DEFAULT_TTL = 10 * 60
+DEFAULT_MAX_ENTRIES = int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", 1024))
+
+# TTL이 지난 뒤에도 백그라운드 갱신을 기다리는 동안 제공할 수 있는 시간 (초)
+DEFAULT_STALE_TTL = int(os.getenv("WEATHER_CACHE_STALE_TTL", 10 * 60))
+
+# 영구 저장소 파일 경로 (비어 있으면 메모리 캐시만 사용)
+CACHE_DB_PATH = os.getenv("WEATHER_CACHE_DB", "")
+
+# 캐시에 저장되는 항목 (값, 가져온 시각, TTL)
+CacheEntry = namedtuple('CacheEntry', ['value', 'fetched_at', 'ttl'])
+
+# 조회 결과 상태
+FRESH = 'fresh'
+STALE = 'stale'
+
+log = logging.getLogger(__name__)
+
+
+def make_key(endpoint, query, units='metric', lang='kr'):
+    """(endpoint, query, units, lang) 형태의 캐시 키를 만드는 함수"""
+    if isinstance(query, dict):
+        query = tuple(sorted(query.items()))
+    return (endpoint, query, units, lang)
+
+
+class TTLCache:
+    """엔드포인트별 TTL과 최대 크기(LRU)를 가진 스레드 안전 캐시
+
+    store 가 주어지면 메모리에 없는 키를 저장소에서 찾고, 저장하는 값은 저장소에도 씁니다.
+    TTL이 지난 항목은 stale_ttl 동안 더 보관되어 stale-while-revalidate 에 사용됩니다.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttls=None, default_ttl=DEFAULT_TTL,
+                 store=None, stale_ttl=DEFAULT_STALE_TTL):
+        self.max_entries = max_entries
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.store = store
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.store_hits = 0
+        self.store_errors = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def ttl_for(self, key):
+        """키의 엔드포인트에 해당하는 TTL 반환"""
+        return self.ttls.get(key[0], self.default_ttl)
+
+    def lookup(self, key, allow_stale=False):
+        """(값, 상태) 반환. 상태는 FRESH, STALE(TTL은 지났지만 stale_ttl 이내), 없으면 None
+
+        allow_stale 이 False 이면 STALE 항목도 실패로 처리합니다.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            state = self._state(entry, now)
+            if entry is not None and state is None:
+                del self._entries[key]
+            if state == FRESH or (state == STALE and allow_stale):
+                self._entries.move_to_end(key)
+                self._count(state)
+                return entry.value, state
+
+        # 다른 프로세스(또는 재시작 전)가 저장한 응답이 있는지 확인
+        if self.store is not None:
+            entry = self._store_call(self.store.get, key)
+            state = self._state(entry, now)
+            if state == FRESH or (state == STALE and allow_stale):
+                with self._lock:
+                    self._put(key, entry)
+                    self._count(state)
+                    self.store_hits += 1
+                return entry.value, state
+
+        with self._lock:
+            self.misses += 1
+        return None, None
+
+    def get(self, key):
+        """유효한 캐시 값을 반환 (없거나 만료되었으면 None)"""
+        return self.lookup(key)[0]
+
+    def peek(self, key):
+        """통계나 LRU 순서에 영향을 주지 않고 메모리의 항목을 반환 (없으면 None)"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def _state(self, entry, now):
+        """항목의 신선도 판정"""
+        if entry is None:
+            return None
+        age = now - entry.fetched_at
+        if age < entry.ttl:
+            return FRESH
+        if age < entry.ttl + self.stale_ttl:
+            return STALE
+        return None
+
+    def _count(self, state):
+        if state == FRESH:
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+
+    def set(self, key, value, ttl=None, fetched_at=None):
+        """값을 저장하고 최대 크기를 넘으면 가장 오래 사용하지 않은 항목을 제거"""
+        if ttl is None:
+            ttl = self.ttl_for(key)
+        entry = CacheEntry(value, time.time() if fetched_at is None else fetched_at, ttl)
+        with self._lock:
+            self._put(key, entry)
+        if self.store is not None:
+            self._store_call(self.store.set, key, entry)
+
+    def _store_call(self, fn, *args):
+        """영구 저장소 호출 (sqlite3 오류는 기록하고 None 반환)"""
+        try:
+            return fn(*args)
+        except sqlite3.Error as e:
+            with self._lock:
+                self.store_errors += 1
+            log.warning("영구 응답 캐시를 사용할 수 없습니다: %s", e)
+            return None
+
+    def _put(self, key, entry):
+        """메모리에 항목을 넣고 LRU 크기를 유지 (잠금을 잡은 상태에서 호출)"""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def warm(self):
+        """영구 저장소의 유효한 응답으로 메모리 캐시를 채우고 채운 개수를 반환"""
+        if self.store is None:
+            return 0
+        # TTL 이 지났어도 stale_ttl 이내인 응답은 백그라운드 갱신 동안 제공할 수 있으므로 함께 예열
+        entries = sorted(self._store_call(self.store.fresh_entries, None, self.stale_ttl) or [],
+                         key=lambda item: item[1].fetched_at)
+        with self._lock:
+            for key, entry in entries[-self.max_entries:]:
+                self._put(key, entry)
+        return min(len(entries), self.max_entries)
+
+    def get_or_fetch(self, key, fetch):
+        """캐시에 없으면 fetch()를 호출해 결과를 저장하고 반환"""
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = fetch()
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        """모든 항목과 통계 초기화"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.stale_hits = 0
+            self.store_hits = 0
+            self.store_errors = 0
+
+    def stats(self):
+        """캐시 적중/실패 통계 반환"""
+        with self._lock:
+            total = self.hits + self.stale_hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / total if total else 0.0,
+                'stale_hits': self.stale_hits,
+                'store_hits': self.store_hits,
+                'store_errors': self.store_errors,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+            }
+
+
+class PayloadMemo:
+    """응답 객체(dict)별로 계산 결과를 보관하는 작은 LRU
+
+    응답 객체 자체를 함께 보관하므로 객체가 살아 있는 동안 id()가 재사용되지 않습니다.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, payload, compute):
+        key = id(payload)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is payload:
+                self._entries.move_to_end(key)
+                return entry[1]
+        value = compute(payload)
+        with self._lock:
+            self._entries[key] = (payload, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+
+def _store_from_env():
+    """WEATHER_CACHE_DB 가 설정되어 있으면 영구 저장소를 열고 정리 스레드를 시작"""
+    if not CACHE_DB_PATH:
+        return None
+    from weather.persist import SQLiteStore
+
+    store = SQLiteStore(CACHE_DB_PATH)
+    store.start_compactor()
+    return store
+
+
+# 모든 세션이 공유하는 응답 캐시 (영구 저장소가 있으면 부팅 시 예열)
+response_cache = TTLCache(store=_store_from_env())
+response_cache.warm()
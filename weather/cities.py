@@ -0,0 +1,79 @@
+"""빠른 선택 도시 목록
+
+해외 도시 빠른 선택 버튼과 세계 날씨 한눈에 보기 격자가 같은 목록을 사용합니다.
+OpenWeather 도시 ID가 있는 도시는 ``group`` 엔드포인트로 한 번에 여러 도시의
+현재 날씨를 가져올 수 있습니다.
+"""
+
+# 지역별 빠른 선택 도시 (버튼 key, 도시명, 국기)
+QUICK_SELECT_CITIES = {
+    "북미": [
+        ("ny_usa", "New York", "🇺🇸"),
+        ("la_usa", "Los Angeles", "🇺🇸"),
+        ("chicago_usa", "Chicago", "🇺🇸"),
+        ("toronto_ca", "Toronto", "🇨🇦"),
+        ("vancouver_ca", "Vancouver", "🇨🇦"),
+    ],
+    "유럽": [
+        ("london_gb", "London", "🇬🇧"),
+        ("paris_fr", "Paris", "🇫🇷"),
+        ("berlin_de", "Berlin", "🇩🇪"),
+        ("rome_it", "Rome", "🇮🇹"),
+        ("madrid_es", "Madrid", "🇪🇸"),
+        ("amsterdam_nl", "Amsterdam", "🇳🇱"),
+    ],
+    "아시아": [
+        ("tokyo_jp", "Tokyo", "🇯🇵"),
+        ("osaka_jp", "Osaka", "🇯🇵"),
+        ("bangkok_th", "Bangkok", "🇹🇭"),
+        ("singapore_sg", "Singapore", "🇸🇬"),
+        ("hongkong_hk", "Hong Kong", "🇭🇰"),
+        ("mumbai_in", "Mumbai", "🇮🇳"),
+    ],
+    "오세아니아": [
+        ("sydney_au", "Sydney", "🇦🇺"),
+        ("melbourne_au", "Melbourne", "🇦🇺"),
+        ("auckland_nz", "Auckland", "🇳🇿"),
+    ],
+    "기타": [
+        ("dubai_ae", "Dubai", "🇦🇪"),
+        ("cairo_eg", "Cairo", "🇪🇬"),
+        ("moscow_ru", "Moscow", "🇷🇺"),
+        ("saopaulo_br", "São Paulo", "🇧🇷"),
+    ],
+}
+
+# OpenWeather 도시 ID (group 엔드포인트용, 없는 도시는 도시명으로 개별 조회)
+CITY_IDS = {
+    "Seoul": 1835848,
+    "Beijing": 1816670,
+    "New York": 5128581,
+    "Los Angeles": 5368361,
+    "Chicago": 4887398,
+    "Toronto": 6167865,
+    "Vancouver": 6173331,
+    "London": 2643743,
+    "Paris": 2988507,
+    "Berlin": 2950159,
+    "Rome": 3169070,
+    "Madrid": 3117735,
+    "Amsterdam": 2759794,
+    "Tokyo": 1850147,
+    "Osaka": 1853909,
+    "Bangkok": 1609350,
+    "Singapore": 1880252,
+    "Hong Kong": 1819729,
+    "Mumbai": 1275339,
+    "Sydney": 2147714,
+    "Melbourne": 2158177,
+    "Auckland": 2193733,
+    "Dubai": 292223,
+    "Cairo": 360630,
+    "Moscow": 524901,
+    "São Paulo": 3448439,
+}
+
+
+def quick_select_names():
+    """빠른 선택 도시명을 지역 순서대로 반환"""
+    return [name for cities in QUICK_SELECT_CITIES.values() for _, name, _ in cities]
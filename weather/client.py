@@ -0,0 +1,367 @@
+"""OpenWeather API 클라이언트
+
+두 앱이 공유하는 단일 진입점입니다. 요청 매개변수 구성, 캐시, 병렬 배치는
+클라이언트가 담당하고, 실제 요청은 교체 가능한 전송 계층(transport)이 처리합니다.
+
+- ``HttpTransport``: 공유 세션으로 실제 API(또는 로컬 스텁 서버)를 호출
+- ``FixtureTransport``: 녹화된 JSON 파일을 재생 (오프라인 테스트/벤치마크)
+- ``RecordingTransport``: 다른 전송 계층의 응답을 JSON 파일로 녹화
+
+전송 계층은 ``get(endpoint, params)`` 메서드 하나만 구현하면 되며, 실패 시
+``requests.exceptions.RequestException`` 을 발생시켜야 합니다.
+"""
+import json
+import os
+import re
+import time
+
+import requests
+
+from weather.breaker import upstream_breaker, last_known_good
+from weather.cache import response_cache, make_key, STALE
+from weather.geo import snap, coordinate_buckets, DEFAULT_PRECISIONS, DEFAULT_PRECISION
+from weather.metrics import upstream_latency, upstream_status
+from weather.parallel import fetch_all, DEFAULT_DEADLINE
+from weather.prewarm import city_popularity
+from weather.ratelimit import upstream_limiter
+from weather.session import get_json, retry_hook, DEFAULT_TIMEOUT
+from weather.singleflight import upstream_flights
+from weather.tracing import span
+
+DEFAULT_BASE_URL = os.getenv("OPENWEATHER_BASE_URL", "http://api.openweathermap.org/data/2.5")
+DEFAULT_FIXTURE_DIR = os.getenv("WEATHER_FIXTURE_DIR", "fixtures")
+# group 엔드포인트 사용 여부와 요청당 최대 도시 수 (API 제한은 20개)
+GROUP_FETCH = os.getenv("WEATHER_GROUP_FETCH", "1") != "0"
+GROUP_SIZE = int(os.getenv("WEATHER_GROUP_SIZE", 20))
+
+# 파일 이름에 넣지 않을 매개변수
+_PRIVATE_PARAMS = ('appid', 'units', 'lang')
+
+
+class FixtureNotFoundError(requests.exceptions.RequestException):
+    """재생할 녹화 파일이 없을 때 발생하는 예외"""
+
+
+def fixture_name(endpoint, params):
+    """요청에 대응하는 녹화 파일 이름을 만드는 함수 (예: weather_q=Seoul.json)"""
+    parts = [f"{k}={v}" for k, v in sorted(params.items()) if k not in _PRIVATE_PARAMS]
+    slug = re.sub(r'[^\w=.,-]+', '-', "_".join(parts))
+    return f"{endpoint}_{slug}.json" if slug else f"{endpoint}.json"
+
+
+class HttpTransport:
+    """공유 HTTP 세션으로 요청을 보내는 전송 계층"""
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, timeout=DEFAULT_TIMEOUT):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def get(self, endpoint, params):
+        return get_json(f"{self.base_url}/{endpoint}", params, timeout=self.timeout)
+
+
+class FixtureTransport:
+    """녹화된 JSON 응답을 재생하는 전송 계층
+
+    요청별 파일(``weather_q=Seoul.json``)이 없으면 엔드포인트 공용 파일
+    (``weather.json``)을 사용합니다.
+    """
+
+    def __init__(self, directory=DEFAULT_FIXTURE_DIR):
+        self.directory = directory
+
+    def get(self, endpoint, params):
+        for name in (fixture_name(endpoint, params), f"{endpoint}.json"):
+            path = os.path.join(self.directory, name)
+            if os.path.exists(path):
+                with open(path, encoding='utf-8') as f:
+                    return json.load(f)
+        raise FixtureNotFoundError(f"녹화된 응답이 없습니다: {fixture_name(endpoint, params)}")
+
+
+class RecordingTransport:
+    """다른 전송 계층의 응답을 녹화 파일로 저장하는 전송 계층"""
+
+    def __init__(self, inner, directory=DEFAULT_FIXTURE_DIR):
+        self.inner = inner
+        self.directory = directory
+
+    def get(self, endpoint, params):
+        data = self.inner.get(endpoint, params)
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, fixture_name(endpoint, params))
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        return data
+
+
+def transport_from_env():
+    """WEATHER_TRANSPORT 환경 변수(http, fixtures, record)에 맞는 전송 계층 생성"""
+    kind = os.getenv("WEATHER_TRANSPORT", "http")
+    if kind == "fixtures":
+        return FixtureTransport()
+    if kind == "record":
+        return RecordingTransport(HttpTransport())
+    return HttpTransport()
+
+
+class OpenWeatherClient:
+    """현재 날씨/5일 예보를 도시명 또는 좌표로 조회하는 클라이언트"""
+
+    def __init__(self, api_key, transport=None, cache=response_cache, units='metric', lang='kr',
+                 refresher=None, flights=upstream_flights, precisions=None, buckets=coordinate_buckets,
+                 popularity=city_popularity, limiter=upstream_limiter, breaker=upstream_breaker,
+                 last_good=last_known_good):
+        self.api_key = api_key
+        self.transport = transport if transport is not None else HttpTransport()
+        self.cache = cache
+        self.units = units
+        self.lang = lang
+        self.refresher = refresher
+        self.flights = flights
+        # 엔드포인트별 좌표 지오해시 정밀도 (0 이면 좌표를 맞추지 않음)
+        self.precisions = dict(DEFAULT_PRECISIONS if precisions is None else precisions)
+        self.buckets = buckets
+        # 도시명 조회 횟수 (예열할 인기 도시를 고르는 데 사용)
+        self.popularity = popularity
+        # 업스트림 분당 호출 한도 (None 이면 제한 없음)
+        self.limiter = limiter
+        # 업스트림 장애 시 요청을 막는 회로 차단기와 대신 돌려줄 위치별 마지막 정상 응답
+        self.breaker = breaker
+        self.last_good = last_good
+
+    def fetch(self, endpoint, query):
+        """캐시를 거쳐 엔드포인트를 호출하는 함수 (query: {'q': ...} 또는 {'lat': ..., 'lon': ...})
+
+        갱신기(refresher)가 있으면 TTL이 지난 값을 바로 돌려주고 백그라운드에서 다시
+        가져오며(stale-while-revalidate), 조회한 키는 만료 전에 미리 갱신됩니다.
+        같은 키에 대해 동시에 진행 중인 업스트림 호출은 하나로 병합됩니다.
+        업스트림 호출이 실패하거나 회로가 열려 있으면 마지막 정상 응답(StalePayload)을
+        대신 돌려주고, 그것도 없으면 예외를 그대로 발생시킵니다.
+        """
+        with span(f"fetch:{endpoint}"):
+            value, key, fetch = self._lookup(endpoint, query)
+            if value is None:
+                value = self._fetch_or_last_good(key, fetch)
+            return value
+
+    def _lookup(self, endpoint, query):
+        """캐시에서 찾은 값(없으면 None), 캐시 키, 업스트림에서 가져오는 함수를 반환
+
+        인기도 기록과 갱신기 예약(만료 전 갱신, stale 값의 백그라운드 재검증)도 여기서 합니다.
+        """
+        if self.popularity is not None and 'q' in query:
+            self.popularity.record(query['q'])
+        key, fetch = self._loader(endpoint, query)
+        if self.cache is None:
+            return None, key, fetch
+
+        value, state = self.cache.lookup(key, allow_stale=self.refresher is not None)
+        if self.refresher is not None:
+            self.refresher.touch(key, fetch)
+            if state == STALE:
+                self.refresher.revalidate(key, fetch)
+        return value, key, fetch
+
+    def _fetch_miss(self, endpoint, key, fetch):
+        with span(f"fetch:{endpoint}"):
+            return self._fetch_or_last_good(key, fetch)
+
+    def _fetch_or_last_good(self, key, fetch):
+        try:
+            return fetch()
+        except requests.exceptions.RequestException:
+            value = self.last_good.get(key) if self.last_good is not None else None
+            if value is None:
+                raise
+            return value
+
+    def _timeout_or_last_good(self, key, result):
+        """배치 마감 시간을 넘긴 결과(TimeoutError)는 마지막 정상 응답으로 대신 (없으면 그대로)"""
+        if isinstance(result, TimeoutError) and self.last_good is not None:
+            value = self.last_good.get(key)
+            if value is not None:
+                return value
+        return result
+
+    def refresh(self, endpoint, query):
+        """캐시 상태와 관계없이 업스트림에서 다시 가져와 캐시에 저장하는 함수 (예열용)"""
+        return self._loader(endpoint, query)[1]()
+
+    def _loader(self, endpoint, query):
+        """(캐시 키, 업스트림에서 가져와 캐시에 저장하는 함수) 반환"""
+        query = self.snap_query(endpoint, query)
+        params = dict(query, appid=self.api_key, units=self.units, lang=self.lang)
+        key = make_key(endpoint, query, self.units, self.lang)
+
+        def load():
+            value = self._upstream(endpoint, params)
+            if value is not None:
+                self._remember(key, value)
+            return value
+
+        return key, lambda: self._single_flight(key, load)
+
+    def _remember(self, key, value):
+        """새로 가져온 응답을 캐시와 마지막 정상 응답 보관소에 저장"""
+        if self.cache is not None:
+            self.cache.set(key, value)
+        if self.last_good is not None:
+            self.last_good.set(key, value)
+
+    def _upstream(self, endpoint, params):
+        """회로 차단기와 호출 한도를 거쳐 전송 계층으로 요청
+
+        회로가 열려 있으면 CircuitOpenError, 한도를 넘으면 RateLimitedError 가 발생하며
+        두 경우 모두 호출 한도 토큰을 쓰지 않습니다.
+        """
+        if self.breaker is None:
+            return self._limited_get(endpoint, params)
+        return self.breaker.call(lambda: self._limited_get(endpoint, params))
+
+    def _limited_get(self, endpoint, params):
+        """토큰 하나를 얻고 전송 계층으로 요청 (세션의 재시도도 한 번마다 토큰을 씀)"""
+        if self.limiter is None:
+            return self._timed_get(endpoint, params)
+        self.limiter.acquire()
+        with retry_hook(self.limiter.acquire_retry):
+            return self._timed_get(endpoint, params)
+
+    def _timed_get(self, endpoint, params):
+        started = time.perf_counter()
+        error = None
+        try:
+            return self.transport.get(endpoint, params)
+        except Exception as e:
+            error = e
+            # 업스트림이 한도 초과를 알리면 토큰이 다시 찰 때까지 다른 요청도 보내지 않음
+            response = getattr(e, 'response', None)
+            if self.limiter is not None and response is not None and response.status_code == 429:
+                self.limiter.bucket.drain()
+            raise
+        finally:
+            upstream_latency.observe(time.perf_counter() - started, endpoint, upstream_status(error))
+
+    def snap_query(self, endpoint, query):
+        """좌표 조회는 지오해시 칸의 중심 좌표로 바꿔서 가까운 위치끼리 캐시를 공유"""
+        if 'lat' not in query or 'lon' not in query:
+            return query
+        precision = self.precisions.get(endpoint, DEFAULT_PRECISION)
+        if not precision:
+            return query
+        geohash, lat, lon = snap(query['lat'], query['lon'], precision)
+        if self.buckets is not None:
+            self.buckets.record(endpoint, geohash)
+        return dict(query, lat=lat, lon=lon)
+
+    def _single_flight(self, key, fn):
+        if self.flights is None:
+            return fn()
+        return self.flights.do(key, fn)
+
+    def fetch_many(self, requests_by_name, deadline=DEFAULT_DEADLINE):
+        """{이름: (endpoint, query)} 요청들을 하나의 병렬 배치로 실행하는 함수
+
+        캐시에 있는 값은 작업 스레드를 거치지 않고 바로 사용하므로, 느린 업스트림 호출이
+        작업 스레드를 붙잡고 있어도 캐시 적중은 기다리지 않습니다. 마감 시간까지 끝나지
+        않은 요청은 마지막 정상 응답이 있으면 그것으로, 없으면 TimeoutError 로 채웁니다.
+        """
+        results = {}
+        tasks = {}
+        keys = {}
+        for name, (endpoint, query) in requests_by_name.items():
+            value, key, fetch = self._lookup(endpoint, query)
+            if value is not None:
+                results[name] = value
+            else:
+                keys[name] = key
+                tasks[name] = lambda endpoint=endpoint, key=key, fetch=fetch: self._fetch_miss(endpoint, key, fetch)
+        if tasks:
+            for name, result in fetch_all(tasks, deadline=deadline).items():
+                results[name] = self._timeout_or_last_good(keys[name], result)
+        return {name: results[name] for name in requests_by_name}
+
+    def current_many(self, city_names, city_ids=None, deadline=DEFAULT_DEADLINE):
+        """여러 도시의 현재 날씨를 한 번의 병렬 배치로 가져오는 함수
+
+        캐시에 있는 도시는 그대로 사용하고, 나머지 중 OpenWeather 도시 ID가 있는 도시는
+        group 엔드포인트로 GROUP_SIZE개씩 묶어서, ID가 없는 도시는 도시명으로 개별
+        요청합니다. group 응답은 도시별 캐시 키로 나누어 저장하므로 이후 단일 도시
+        조회도 캐시를 사용합니다. group 요청이 실패한 도시만 개별 요청으로 다시
+        가져옵니다. 반환 형식은 fetch_many 와 같습니다 ({도시명: 결과 또는 예외}).
+        """
+        if city_ids is None:
+            from weather.cities import CITY_IDS as city_ids
+
+        results = {}
+        pending = []
+        for name in city_names:
+            value = self.cache.get(self._city_key(name)) if self.cache is not None else None
+            if value is not None:
+                results[name] = value
+            else:
+                pending.append(name)
+
+        grouped = [name for name in pending if GROUP_FETCH and name in city_ids]
+        tasks = {name: (lambda name=name: self.current(name)) for name in pending if name not in grouped}
+        for start in range(0, len(grouped), GROUP_SIZE):
+            chunk = grouped[start:start + GROUP_SIZE]
+            tasks[('group', start)] = lambda chunk=chunk: self._fetch_group(chunk, city_ids)
+        batch = fetch_all(tasks, deadline=deadline)
+
+        retry = []
+        for name, result in batch.items():
+            if not isinstance(name, tuple):
+                results[name] = self._timeout_or_last_good(self._city_key(name), result)
+                continue
+            chunk = grouped[name[1]:name[1] + GROUP_SIZE]
+            if isinstance(result, TimeoutError):
+                # 마감 시간을 이미 다 썼으므로 다시 요청하지 않음
+                results.update((city, self._timeout_or_last_good(self._city_key(city), result)) for city in chunk)
+                continue
+            found = {} if isinstance(result, Exception) else result
+            results.update((city, found[city]) for city in chunk if city in found)
+            retry.extend(city for city in chunk if city not in found)
+        if retry:
+            results.update(self.fetch_many({name: ('weather', {'q': name}) for name in retry},
+                                           deadline=deadline))
+        return {name: results[name] for name in city_names}
+
+    def _fetch_group(self, names, city_ids):
+        """group 엔드포인트로 여러 도시를 조회하고 {도시명: 현재 날씨} 를 반환"""
+        names_by_id = {city_ids[name]: name for name in names}
+        query = {'id': ",".join(str(city_id) for city_id in names_by_id)}
+        params = dict(query, appid=self.api_key, units=self.units, lang=self.lang)
+        key = make_key('group', query, self.units, self.lang)
+        with span("fetch:group"):
+            payload = self._single_flight(key, lambda: self._upstream('group', params))
+
+        found = {}
+        for item in (payload or {}).get('list', []):
+            name = names_by_id.get(item.get('id'))
+            if name is None:
+                continue
+            # group 응답 항목에는 cod 가 없으므로 weather 응답과 같은 모양으로 맞춤
+            item = dict(item, cod=200)
+            found[name] = item
+            self._remember(self._city_key(name), item)
+        return found
+
+    def _city_key(self, city_name):
+        return make_key('weather', {'q': city_name}, self.units, self.lang)
+
+    def current(self, city_name):
+        """도시명으로 현재 날씨 조회"""
+        return self.fetch('weather', {'q': city_name})
+
+    def forecast(self, city_name):
+        """도시명으로 5일 예보 조회"""
+        return self.fetch('forecast', {'q': city_name})
+
+    def current_by_coordinates(self, lat, lon):
+        """위도, 경도로 현재 날씨 조회"""
+        return self.fetch('weather', {'lat': lat, 'lon': lon})
+
+    def forecast_by_coordinates(self, lat, lon):
+        """위도, 경도로 5일 예보 조회"""
+        return self.fetch('forecast', {'lat': lat, 'lon': lon})
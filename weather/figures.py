@@ -0,0 +1,95 @@
+"""Plotly figure 메모이즈
+
+사이드바 조작처럼 위치가 바뀌지 않는 rerun 에서도 figure 를 매번 새로 만들지 않도록,
+figure 생성 함수의 결과를 (함수, 입력 데이터 해시, 옵션) 기준으로 캐시합니다.
+캐시된 figure 는 여러 세션이 공유하므로 받은 쪽에서 수정하면 안 됩니다.
+"""
+import functools
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from weather.cache import PayloadMemo
+from weather.tracing import span
+
+# 보관할 figure 개수
+FIGURE_CACHE_SIZE = int(os.getenv("WEATHER_FIGURE_CACHE_SIZE", 128))
+
+_digests = PayloadMemo(256)
+
+
+def payload_digest(payload):
+    """응답(dict/list)의 내용 해시 (같은 응답 객체는 한 번만 계산)"""
+    return _digests.get_or_compute(payload, lambda p: hashlib.blake2b(
+        json.dumps(p, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'),
+        digest_size=16,
+    ).hexdigest())
+
+
+class FigureCache:
+    """최대 개수가 정해진 figure LRU 캐시"""
+
+    def __init__(self, max_entries=FIGURE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            figure = self._entries.get(key)
+            if figure is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return figure
+            self.misses += 1
+        figure = build()
+        with self._lock:
+            self._entries[key] = figure
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return figure
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'size': len(self._entries), 'max_entries': self.max_entries}
+
+
+# 프로세스 전체가 공유하는 figure 캐시
+figure_cache = FigureCache()
+
+
+def _arg_key(value):
+    """인자를 캐시 키로 변환 (응답 dict/list 는 내용 해시, 뷰 모델은 cache_key 사용)"""
+    if isinstance(value, (dict, list)):
+        return payload_digest(value)
+    cache_key = getattr(value, 'cache_key', None)
+    if cache_key is not None:
+        return cache_key
+    return value
+
+
+def memoize_figure(builder):
+    """figure 생성 함수를 입력 데이터와 옵션 기준으로 메모이즈하는 데코레이터
+
+    Streamlit 은 앱 스크립트를 매번 다시 실행해 함수 객체가 새로 만들어지므로,
+    함수 객체 대신 모듈 이름, 함수 이름, 코드 객체를 키에 사용합니다.
+    """
+    @functools.wraps(builder)
+    def wrapper(*args, **kwargs):
+        key = (
+            builder.__module__,
+            builder.__qualname__,
+            builder.__code__,
+            tuple(_arg_key(arg) for arg in args),
+            tuple(sorted((name, _arg_key(value)) for name, value in kwargs.items())),
+        )
+        with span(f"figure:{builder.__name__}"):
+            return figure_cache.get_or_build(key, lambda: builder(*args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,115 @@
+"""5일 예보 응답을 열(column) 단위 데이터프레임과 일별 요약 레코드로 변환
+
+예보 응답은 캐시에서 같은 dict 객체로 계속 재사용되므로, 변환 결과를 응답 객체별로
+한 번만 계산해 두고 렌더링 단계에서는 미리 계산된 프레임만 읽습니다.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from dateutil.tz import tzlocal
+
+from weather.cache import PayloadMemo
+from weather.tracing import span
+
+# 5일 * 8회 (3시간 간격)
+MAX_ITEMS = 40
+
+# 변환 결과를 보관할 응답 객체 수
+FRAME_CACHE_SIZE = 64
+
+_LOCAL_TZ = tzlocal()
+
+WEEKDAYS = ("월", "화", "수", "목", "금", "토", "일")
+
+# 응답 하나에서 계산한 결과 (3시간 간격 프레임, 일별 요약 레코드 목록)
+ForecastView = namedtuple('ForecastView', ['hourly', 'daily_records'])
+
+
+def parse_forecast(forecast_data, limit=MAX_ITEMS):
+    """예보 응답을 열 단위 배열로 변환해 데이터프레임으로 반환하는 함수
+
+    열: datetime, date('%m/%d'), time('%H:%M'), temp, temp_min, temp_max,
+        humidity, description, icon, wind_speed
+    """
+    items = forecast_data['list'][:limit]
+    n = len(items)
+    mains = [item['main'] for item in items]
+    conditions = [item['weather'][0] for item in items]
+
+    # 에포크 초 → 서버 현지 시각 (datetime.fromtimestamp 와 같은 기준)
+    epochs = np.fromiter((item['dt'] for item in items), dtype=np.int64, count=n)
+    datetimes = (pd.to_datetime(epochs, unit='s', utc=True)
+                 .tz_convert(_LOCAL_TZ)
+                 .tz_localize(None))
+
+    return pd.DataFrame({
+        'datetime': datetimes,
+        'date': datetimes.strftime('%m/%d'),
+        'time': datetimes.strftime('%H:%M'),
+        'temp': np.fromiter((m['temp'] for m in mains), dtype=np.float64, count=n),
+        'temp_min': np.fromiter((m['temp_min'] for m in mains), dtype=np.float64, count=n),
+        'temp_max': np.fromiter((m['temp_max'] for m in mains), dtype=np.float64, count=n),
+        'humidity': np.fromiter((m['humidity'] for m in mains), dtype=np.float64, count=n),
+        'description': [c['description'] for c in conditions],
+        'icon': [c['icon'] for c in conditions],
+        'wind_speed': np.fromiter((item['wind']['speed'] for item in items), dtype=np.float64, count=n),
+    })
+
+
+def daily_records(frame):
+    """3시간 간격 프레임을 날짜별로 요약한 레코드 목록 (날짜 순)
+
+    키: day(해당 날짜 0시), date('%m/%d'), weekday('월'~'일'), min_temp, max_temp,
+        avg_temp, humidity(평균), wind_speed(평균), description, icon
+    description/icon 은 그날 가장 많이 나온 날씨 상태이며, 아이콘은 낮 아이콘을 사용합니다.
+    예보는 최대 40행이므로 groupby 대신 한 번의 순회로 모읍니다.
+    """
+    days = frame['datetime'].dt.normalize().to_numpy()
+    groups = {}     # 날짜 -> (온도, 습도, 풍속 목록, {(아이콘 종류, 설명): 횟수})
+    for day, temp, humidity, wind_speed, icon, description in zip(
+            days, frame['temp'].tolist(), frame['humidity'].tolist(), frame['wind_speed'].tolist(),
+            frame['icon'].tolist(), frame['description'].tolist()):
+        group = groups.get(day)
+        if group is None:
+            group = groups[day] = ([], [], [], {})
+        group[0].append(temp)
+        group[1].append(humidity)
+        group[2].append(wind_speed)
+        condition = (icon[:2], description)
+        group[3][condition] = group[3].get(condition, 0) + 1
+
+    records = []
+    for day in sorted(groups):
+        temps, humidities, wind_speeds, conditions = groups[day]
+        # 횟수가 같으면 먼저 나온 상태 (dict 는 처음 나온 순서를 유지)
+        code, description = max(conditions, key=conditions.get)
+        day = pd.Timestamp(day)
+        records.append({
+            'day': day,
+            'date': day.strftime('%m/%d'),
+            'weekday': WEEKDAYS[day.dayofweek],
+            'min_temp': min(temps),
+            'max_temp': max(temps),
+            'avg_temp': sum(temps) / len(temps),
+            'humidity': sum(humidities) / len(humidities),
+            'wind_speed': sum(wind_speeds) / len(wind_speeds),
+            'description': description,
+            'icon': code + 'd',
+        })
+    return records
+
+
+def build_view(forecast_data):
+    """예보 응답 하나에 대한 ForecastView 를 계산"""
+    hourly = parse_forecast(forecast_data)
+    return ForecastView(hourly, daily_records(hourly))
+
+
+_views = PayloadMemo(FRAME_CACHE_SIZE)
+
+
+def forecast_view(forecast_data):
+    """예보 응답의 ForecastView 를 반환 (응답 객체당 한 번만 계산, 반환값은 수정하지 말 것)"""
+    with span("parse:forecast"):
+        return _views.get_or_compute(forecast_data, build_view)
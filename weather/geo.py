@@ -0,0 +1,114 @@
+"""좌표를 지오해시 격자로 맞추는 도우미
+
+IP 위치 등에서 얻은 원시 좌표를 그대로 캐시 키로 쓰면 몇백 미터 떨어진 사용자끼리도
+캐시를 공유하지 못합니다. 조회 전에 좌표를 지오해시 칸의 중심으로 맞추어, 가까운
+사용자들이 하나의 관측값을 재사용하도록 합니다.
+
+정밀도별 칸 크기 (대략): 4 → 39km x 20km, 5 → 4.9km x 4.9km, 6 → 1.2km x 0.6km
+"""
+import os
+import threading
+import time
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# 엔드포인트별 지오해시 정밀도 (예보는 넓은 지역에서 거의 같으므로 더 거칠게)
+DEFAULT_PRECISIONS = {
+    'weather': int(os.getenv("WEATHER_GEOHASH_PRECISION_WEATHER", 6)),
+    'forecast': int(os.getenv("WEATHER_GEOHASH_PRECISION_FORECAST", 5)),
+}
+DEFAULT_PRECISION = 6
+
+# 이 시간(초) 안에 조회된 칸을 "살아 있는" 칸으로 셈
+BUCKET_WINDOW = float(os.getenv("WEATHER_GEOHASH_BUCKET_WINDOW", 60 * 60))
+# 기록할 때 오래된 칸을 정리하기 시작하는 칸 수
+PRUNE_THRESHOLD = 1000
+
+
+def encode_geohash(lat, lon, precision=DEFAULT_PRECISION):
+    """위도, 경도를 지오해시 문자열로 변환"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def decode_geohash(geohash):
+    """지오해시 칸의 중심 (위도, 경도) 반환"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        index = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (index >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+
+def snap(lat, lon, precision=DEFAULT_PRECISION):
+    """좌표를 지오해시 칸의 중심으로 맞추고 (지오해시, 위도, 경도) 반환"""
+    geohash = encode_geohash(float(lat), float(lon), precision)
+    center_lat, center_lon = decode_geohash(geohash)
+    return geohash, round(center_lat, 5), round(center_lon, 5)
+
+
+class BucketTracker:
+    """최근에 조회된 (엔드포인트, 지오해시) 칸을 추적해 살아 있는 칸 수를 세는 도우미"""
+
+    def __init__(self, window=BUCKET_WINDOW):
+        self.window = window
+        self._last_seen = {}
+        # 칸 수가 이 값을 넘으면 기록할 때 오래된 칸을 정리 (정리 후 남은 수의 두 배로 늘림)
+        self._prune_at = PRUNE_THRESHOLD
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, geohash):
+        now = time.time()
+        with self._lock:
+            self._last_seen[(endpoint, geohash)] = now
+            if len(self._last_seen) > self._prune_at:
+                self._prune(now)
+                self._prune_at = max(PRUNE_THRESHOLD, 2 * len(self._last_seen))
+
+    def _prune(self, now):
+        """창(window)보다 오래된 칸 삭제 (잠금을 잡은 상태에서 호출)"""
+        self._last_seen = {bucket: seen for bucket, seen in self._last_seen.items()
+                           if now - seen <= self.window}
+
+    def live_buckets(self, now=None):
+        """엔드포인트별 살아 있는 칸 수 반환 (오래된 칸은 정리)"""
+        now = time.time() if now is None else now
+        counts = {}
+        with self._lock:
+            self._prune(now)
+            for endpoint, _ in self._last_seen:
+                counts[endpoint] = counts.get(endpoint, 0) + 1
+        return counts
+
+
+# 프로세스 전체가 공유하는 좌표 칸 추적기
+coordinate_buckets = BucketTracker()
@@ -0,0 +1,197 @@
+"""IP 기반 위치 조회
+
+"현재 위치 찾기" 버튼은 ip-api.com 을 호출하는데, 이 서비스는 분당 호출 수가 엄격하게
+제한되어 있고(무료 45회) 한도를 넘기면 서버 IP가 차단됩니다. 그래서 위치 조회는
+다음 순서로 처리합니다.
+
+1. 클라이언트 IP별 TTL 캐시 (같은 사용자가 다시 눌러도 호출하지 않음)
+2. 제공자 한도에 맞춘 토큰 버킷을 통과한 경우에만 업스트림 호출
+   (같은 IP의 동시 요청은 하나로 병합)
+3. 한도를 다 썼거나 호출이 실패하면 오래된 캐시 값, 그다음 로컬 GeoIP 데이터베이스
+
+로컬 데이터베이스는 선택 사항입니다. ``geoip2`` 패키지를 설치하고
+``WEATHER_GEOIP_DB`` 에 MaxMind GeoLite2-City ``.mmdb`` 파일 경로를 지정하면 사용합니다.
+"""
+import ipaddress
+import os
+
+import requests
+
+from weather.cache import TTLCache
+from weather.ratelimit import RateLimitedError, TokenBucket
+from weather.session import get_json, retry_hook, CONNECT_TIMEOUT
+from weather.singleflight import SingleFlight
+
+IP_LOCATION_URL = os.getenv("IP_LOCATION_URL", "http://ip-api.com/json/")
+# 제공자 호출 한도 (분당), 위치 캐시 TTL과 한도 초과 시 오래된 값을 쓸 수 있는 기간 (초)
+IP_LOCATION_RATE = int(os.getenv("WEATHER_IP_LOCATION_RATE", 45))
+IP_LOCATION_TTL = float(os.getenv("WEATHER_IP_LOCATION_TTL", 24 * 3600))
+IP_LOCATION_STALE_TTL = float(os.getenv("WEATHER_IP_LOCATION_STALE_TTL", 7 * 24 * 3600))
+IP_LOCATION_CACHE_SIZE = int(os.getenv("WEATHER_IP_LOCATION_CACHE_SIZE", 4096))
+GEOIP_DB_PATH = os.getenv("WEATHER_GEOIP_DB", "")
+
+# 클라이언트 IP를 알 수 없을 때(로컬 실행 등) 사용하는 캐시 키 (서버 자신의 위치)
+SELF = 'self'
+
+
+def client_ip(headers=None, remote_ip=None):
+    """프록시 헤더와 접속 주소에서 공인 클라이언트 IP를 고르는 함수 (없으면 None)"""
+    candidates = []
+    forwarded = (headers or {}).get('X-Forwarded-For', '')
+    candidates.extend(part.strip() for part in forwarded.split(',') if part.strip())
+    if remote_ip:
+        candidates.append(remote_ip)
+    for candidate in candidates:
+        try:
+            if ipaddress.ip_address(candidate).is_global:
+                return candidate
+        except ValueError:
+            continue
+    return None
+
+
+def parse_ip_api(data):
+    """ip-api.com 응답을 앱에서 쓰는 위치 딕셔너리로 바꾸는 함수 (실패 응답이면 None)"""
+    if not data or data.get('status') != 'success':
+        return None
+    return {
+        'city': data.get('city', ''),
+        'country': data.get('country', ''),
+        'lat': data.get('lat', 0),
+        'lon': data.get('lon', 0),
+        'region': data.get('regionName', ''),
+        'timezone': data.get('timezone', ''),
+    }
+
+
+class LocalGeoIP:
+    """MaxMind GeoLite2-City 데이터베이스 조회 (geoip2 패키지나 파일이 없으면 비활성)"""
+
+    def __init__(self, path=GEOIP_DB_PATH):
+        self.path = path
+        self._reader = None
+        self._failed = not path
+
+    def _open(self):
+        if self._reader is None and not self._failed:
+            try:
+                import geoip2.database
+
+                self._reader = geoip2.database.Reader(self.path)
+            except (ImportError, OSError, ValueError):
+                self._failed = True
+        return self._reader
+
+    @property
+    def available(self):
+        return self._open() is not None
+
+    def lookup(self, ip):
+        reader = self._open()
+        if reader is None or ip is None:
+            return None
+        try:
+            record = reader.city(ip)
+        except Exception:
+            return None
+        if record.location.latitude is None:
+            return None
+        return {
+            'city': record.city.name or '',
+            'country': record.country.name or '',
+            'lat': record.location.latitude,
+            'lon': record.location.longitude,
+            'region': record.subdivisions.most_specific.name or '',
+            'timezone': record.location.time_zone or '',
+        }
+
+
+class IPLocator:
+    """캐시와 호출 한도를 거쳐 IP 위치를 조회하는 도우미
+
+    반환하는 위치 딕셔너리에는 어디서 찾았는지를 나타내는 ``source``
+    (``ip-api``, ``cache``, ``stale``, ``local``)가 들어 있습니다.
+    """
+
+    def __init__(self, url=IP_LOCATION_URL, bucket=None, cache=None, fallback=None, flights=None):
+        self.url = url
+        self.bucket = bucket if bucket is not None else TokenBucket(IP_LOCATION_RATE)
+        self.cache = cache if cache is not None else TTLCache(
+            max_entries=IP_LOCATION_CACHE_SIZE, ttls={}, default_ttl=IP_LOCATION_TTL,
+            stale_ttl=IP_LOCATION_STALE_TTL)
+        self.fallback = fallback if fallback is not None else LocalGeoIP()
+        # OpenWeather 요청과 병합 통계가 섞이지 않도록 위치 조회 전용 인스턴스 사용
+        self.flights = flights if flights is not None else SingleFlight()
+        self.upstream_calls = 0
+        self.limited = 0
+        self.fallbacks = 0
+
+    def locate(self, ip=None):
+        """IP(없으면 서버 자신)의 위치를 반환, 어디서도 찾지 못하면 None"""
+        key = ('ip-location', ip or SELF)
+        location = self.cache.get(key)
+        if location is not None:
+            return dict(location, source='cache')
+
+        try:
+            location = self._single_flight(key, lambda: self._load(ip))
+        except RateLimitedError:
+            self.limited += 1
+            location = None
+        except requests.exceptions.HTTPError as e:
+            # 제공자가 한도 초과를 알리면 버킷을 비워서 토큰이 다시 찰 때까지 호출하지 않음
+            if e.response is not None and e.response.status_code == 429:
+                self.bucket.drain()
+            location = None
+        except requests.exceptions.RequestException:
+            location = None
+
+        if location is not None:
+            self.cache.set(key, location)
+            return dict(location, source='ip-api')
+        return self._fallback(key, ip)
+
+    def _acquire(self):
+        """토큰 하나를 쓰고 업스트림 호출 수를 셈 (토큰이 없으면 RateLimitedError)"""
+        if not self.bucket.try_acquire():
+            raise RateLimitedError("위치 조회 호출 한도를 모두 사용했습니다")
+        self.upstream_calls += 1
+
+    def _load(self, ip):
+        self._acquire()
+        url = f"{self.url.rstrip('/')}/{ip}" if ip else self.url
+        # 세션의 재시도도 한 번마다 토큰을 쓰고, 429 는 재시도하지 않음 (한도 초과 후 계속 호출하면 차단됨)
+        with retry_hook(self._acquire):
+            return parse_ip_api(get_json(url, timeout=(CONNECT_TIMEOUT, 5)))
+
+    def _single_flight(self, key, fn):
+        if self.flights is None:
+            return fn()
+        return self.flights.do(key, fn)
+
+    def _fallback(self, key, ip):
+        """업스트림을 쓸 수 없을 때 오래된 캐시 값, 그다음 로컬 데이터베이스를 사용"""
+        value, _ = self.cache.lookup(key, allow_stale=True)
+        if value is not None:
+            self.fallbacks += 1
+            return dict(value, source='stale')
+        location = self.fallback.lookup(ip) if self.fallback is not None else None
+        if location is not None:
+            self.fallbacks += 1
+            return dict(location, source='local')
+        return None
+
+    def stats(self):
+        cache_stats = self.cache.stats()
+        return {
+            'cached': cache_stats['size'],
+            'cache_hits': cache_stats['hits'],
+            'upstream_calls': self.upstream_calls,
+            'limited': self.limited,
+            'fallbacks': self.fallbacks,
+            'tokens': round(self.bucket.available(), 1),
+        }
+
+
+# 프로세스 전체가 공유하는 IP 위치 조회기
+ip_locator = IPLocator()
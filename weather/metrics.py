@@ -0,0 +1,310 @@
+"""프로세스 전역 성능 지표와 Prometheus 텍스트 엔드포인트
+
+시간이 어디서 쓰이는지(업스트림 호출, 화면 영역 렌더링, Streamlit 재실행) 확인할 수
+있도록 지표를 모아 Prometheus 텍스트 형식으로 내보냅니다. 외부 패키지 없이 표준
+라이브러리만 사용합니다.
+
+- ``weather_upstream_request_seconds{endpoint,status}``: 업스트림 호출 지연 히스토그램
+- ``weather_render_seconds{app,section}``: 화면 영역별 렌더링 시간 히스토그램
+- ``weather_rerun_seconds{app}``: 앱 스크립트 한 번 실행 시간 히스토그램
+- ``weather_cache_requests_total{result}``: 응답 캐시 적중/오래된 값/실패 수
+- ``weather_active_sessions``, ``weather_reruns_per_second``: 최근 활동 기준 게이지
+
+``WEATHER_METRICS_PORT`` 를 지정하면 그 포트의 ``/metrics`` 에서 지표를 제공하고,
+``WEATHER_METRICS_DUMP`` 를 지정하면 주기적으로 파일에 씁니다.
+"""
+import contextlib
+import functools
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 지표 HTTP 서버 포트 (0 이면 끔)와 지표를 주기적으로 쓸 파일, 쓰는 주기 (초)
+METRICS_PORT = int(os.getenv("WEATHER_METRICS_PORT", 0))
+METRICS_DUMP_PATH = os.getenv("WEATHER_METRICS_DUMP", "")
+METRICS_DUMP_INTERVAL = float(os.getenv("WEATHER_METRICS_DUMP_INTERVAL", 60))
+# 활성 세션으로 볼 최근 재실행 시간과 초당 재실행 수를 계산하는 구간 (초)
+ACTIVE_SESSION_WINDOW = float(os.getenv("WEATHER_METRICS_SESSION_WINDOW", 5 * 60))
+RERUN_RATE_WINDOW = 60
+
+# 히스토그램 구간 상한 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+log = logging.getLogger(__name__)
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{str(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """레이블별로 누적되는 카운터"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, _labels(self.labels, key), value) for key, value in sorted(self._values.items())]
+
+
+class Histogram:
+    """레이블별 누적 구간 히스토그램 (Prometheus 의 _bucket/_sum/_count 형식)"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}   # 레이블 값 -> [구간별 개수..., 합계, 개수]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextlib.contextmanager
+    def time(self, *label_values):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *label_values)
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    samples.append((f"{self.name}_bucket", _labels(self.labels + ('le',), key + (f"{bound:g}",)),
+                                    cumulative))
+                samples.append((f"{self.name}_bucket", _labels(self.labels + ('le',), key + ('+Inf',)), series[-1]))
+                samples.append((f"{self.name}_sum", _labels(self.labels, key), round(series[-2], 6)))
+                samples.append((f"{self.name}_count", _labels(self.labels, key), series[-1]))
+        return samples
+
+
+class CallbackMetric:
+    """내보낼 때마다 함수로 값을 읽는 지표 (fn() -> {레이블 값 튜플: 값})"""
+
+    def __init__(self, name, help_text, fn, labels=(), kind='gauge'):
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+        self.labels = tuple(labels)
+        self.kind = kind
+
+    def samples(self):
+        try:
+            values = self.fn()
+        except Exception:
+            return []
+        return [(self.name, _labels(self.labels, key), value) for key, value in sorted(values.items())]
+
+
+class SessionActivity:
+    """세션별 마지막 재실행 시각과 최근 재실행 시각을 기록하는 도우미"""
+
+    def __init__(self, window=ACTIVE_SESSION_WINDOW, rate_window=RERUN_RATE_WINDOW):
+        self.window = window
+        self.rate_window = rate_window
+        self._last_seen = {}
+        self._reruns = deque()
+        self._lock = threading.Lock()
+
+    def record(self, session_id, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._last_seen[session_id] = now
+            self._reruns.append(now)
+            self._trim(now)
+
+    def _trim(self, now):
+        while self._reruns and now - self._reruns[0] >= self.rate_window:
+            self._reruns.popleft()
+        if len(self._last_seen) > 1000:
+            self._last_seen = {session: seen for session, seen in self._last_seen.items()
+                               if now - seen < self.window}
+
+    def active_sessions(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            return sum(1 for seen in self._last_seen.values() if now - seen < self.window)
+
+    def reruns_per_second(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._trim(now)
+            return len(self._reruns) / self.rate_window
+
+
+class MetricsRegistry:
+    """지표 목록을 보관하고 Prometheus 텍스트 형식으로 내보내는 레지스트리"""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics = [m for m in self._metrics if m.name != metric.name] + [metric]
+        return metric
+
+    def render(self):
+        """Prometheus 텍스트 노출 형식 (text/plain; version=0.0.4)"""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name}{labels} {value:g}" if isinstance(value, float) else f"{name}{labels} {value}"
+                         for name, labels, value in metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+def upstream_status(error):
+    """업스트림 호출 결과를 상태 레이블로 변환 (HTTP 상태 코드, 없으면 예외 종류)"""
+    if error is None:
+        return "200"
+    response = getattr(error, 'response', None)
+    if response is not None and getattr(response, 'status_code', None):
+        return str(response.status_code)
+    return type(error).__name__
+
+
+# 프로세스 전체가 공유하는 지표 레지스트리와 기본 지표
+registry = MetricsRegistry()
+upstream_latency = registry.register(Histogram(
+    'weather_upstream_request_seconds', "Upstream API latency by endpoint and status",
+    labels=('endpoint', 'status')))
+render_latency = registry.register(Histogram(
+    'weather_render_seconds', "Render duration of a UI section", labels=('app', 'section')))
+rerun_latency = registry.register(Histogram(
+    'weather_rerun_seconds', "Duration of one Streamlit script run", labels=('app',)))
+reruns_total = registry.register(Counter('weather_reruns_total', "Streamlit script runs", labels=('app',)))
+session_activity = SessionActivity()
+registry.register(CallbackMetric(
+    'weather_active_sessions', "Sessions that reran within the activity window",
+    lambda: {(): session_activity.active_sessions()}))
+registry.register(CallbackMetric(
+    'weather_reruns_per_second', "Script runs per second over the last minute",
+    lambda: {(): round(session_activity.reruns_per_second(), 4)}))
+
+
+def _cache_counts():
+    from weather.cache import response_cache
+
+    stats = response_cache.stats()
+    return {('hit',): stats['hits'], ('stale',): stats['stale_hits'], ('miss',): stats['misses']}
+
+
+registry.register(CallbackMetric(
+    'weather_cache_requests_total', "Response cache lookups by result", _cache_counts,
+    labels=('result',), kind='counter'))
+
+
+def timed_section(app, section):
+    """화면 영역 함수의 실행 시간을 render_latency 에 기록하는 데코레이터"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with render_latency.time(app, section):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextlib.contextmanager
+def track_rerun(app, session_id=None):
+    """앱 스크립트 한 번 실행의 시간, 횟수, 세션 활동을 기록"""
+    reruns_total.inc(app)
+    if session_id is not None:
+        session_activity.record(session_id)
+    with rerun_latency.time(app):
+        yield
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port=METRICS_PORT, host="0.0.0.0"):
+    """/metrics 를 제공하는 데몬 스레드 HTTP 서버 시작 (port 가 0 이면 None)"""
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError:
+        # 같은 포트를 이미 다른 프로세스(또는 다른 앱)가 쓰고 있으면 엔드포인트 없이 계속 실행
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="weather-metrics", daemon=True).start()
+    return server
+
+
+def write_metrics(path):
+    """지표를 임시 파일에 쓴 뒤 교체 (읽는 쪽이 반쯤 쓴 파일을 보지 않도록)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(registry.render())
+    os.replace(tmp_path, path)
+
+
+def start_metrics_dump(path=METRICS_DUMP_PATH, interval=METRICS_DUMP_INTERVAL):
+    """interval 초마다 지표를 파일에 쓰는 데몬 스레드 시작 (path 가 비어 있으면 None)"""
+    if not path:
+        return None
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            try:
+                write_metrics(path)
+            except OSError as e:
+                # 디스크 부족이나 권한 문제가 있어도 다음 주기에 다시 시도
+                log.warning("지표 파일을 쓸 수 없습니다 (%s): %s", path, e)
+
+    threading.Thread(target=run, name="weather-metrics-dump", daemon=True).start()
+    return stop
@@ -0,0 +1,37 @@
+"""여러 API 호출을 하나의 배치로 병렬 실행하는 도우미
+
+현재 날씨와 예보처럼 서로 독립적인 요청을 동시에 보내서, 화면이 그려지기까지의
+시간이 각 요청 시간의 합이 아니라 가장 느린 요청 시간이 되도록 합니다.
+작업은 호출한 쪽의 ``contextvars`` 컨텍스트를 복사해서 실행하므로, 요청 우선순위와
+재실행 추적이 작업 스레드에도 그대로 이어집니다.
+"""
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# 프로세스 전체가 공유하는 작업 스레드 수와 배치 전체 마감 시간 (초)
+MAX_WORKERS = int(os.getenv("WEATHER_FETCH_WORKERS", 16))
+DEFAULT_DEADLINE = float(os.getenv("WEATHER_FETCH_DEADLINE", 15))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="weather-fetch")
+
+
+def fetch_all(tasks, deadline=DEFAULT_DEADLINE):
+    """{이름: 인자 없는 호출 함수} 를 병렬로 실행해 {이름: 결과} 를 반환하는 함수
+
+    모든 작업은 하나의 마감 시간(deadline)을 공유합니다. 예외가 발생한 작업은
+    그 예외 객체를, 마감 시간까지 끝나지 않은 작업은 TimeoutError 를 결과로 가집니다.
+    """
+    futures = {name: _executor.submit(contextvars.copy_context().run, task) for name, task in tasks.items()}
+    done, _ = wait(futures.values(), timeout=deadline)
+
+    results = {}
+    for name, future in futures.items():
+        if future not in done:
+            future.cancel()
+            results[name] = TimeoutError(f"{deadline:g}초 안에 응답이 없습니다")
+        elif future.exception() is not None:
+            results[name] = future.exception()
+        else:
+            results[name] = future.result()
+    return results
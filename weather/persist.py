@@ -0,0 +1,127 @@
+"""SQLite 기반 영구 응답 캐시
+
+프로세스가 재시작되어도 응답을 잃지 않도록 원본 JSON을 가져온 시각, TTL과 함께
+단일 파일에 저장합니다. WAL 모드를 사용하므로 여러 워커 프로세스가 동시에 읽을 수
+있고, 만료된 행은 백그라운드 스레드가 주기적으로 정리합니다.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from weather.cache import CacheEntry, DEFAULT_STALE_TTL
+
+# 만료된 행 정리 주기와, 만료 후에도 보관할 시간 (초)
+# 기본값은 캐시의 stale 보관 시간이므로 재시작 직후에도 stale-while-revalidate 로 제공할 응답이 남음
+COMPACT_INTERVAL = float(os.getenv("WEATHER_CACHE_DB_COMPACT_INTERVAL", 300))
+RETENTION = float(os.getenv("WEATHER_CACHE_DB_RETENTION", DEFAULT_STALE_TTL))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key        TEXT PRIMARY KEY,
+    endpoint   TEXT NOT NULL,
+    payload    TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    ttl        REAL NOT NULL
+)
+"""
+
+
+def dump_key(key):
+    """캐시 키(튜플)를 문자열로 변환"""
+    return json.dumps(key, ensure_ascii=False, separators=(',', ':'))
+
+
+def load_key(text):
+    """dump_key 로 만든 문자열을 캐시 키(튜플)로 복원"""
+    endpoint, query, units, lang = json.loads(text)
+    if isinstance(query, list):
+        query = tuple(tuple(item) if isinstance(item, list) else item for item in query)
+    return (endpoint, query, units, lang)
+
+
+class SQLiteStore:
+    """TTLCache 아래에 두는 단일 파일 영구 저장소"""
+
+    def __init__(self, path, retention=RETENTION):
+        self.path = path
+        self.retention = retention
+        self._local = threading.local()
+        self._compactor = None
+        self._stop = threading.Event()
+        with self._connect() as conn:
+            conn.execute(_SCHEMA)
+
+    def _connect(self):
+        """스레드마다 별도의 연결을 사용 (sqlite3 연결은 스레드 간 공유 불가)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """저장된 항목을 반환 (없으면 None, 만료 여부는 호출하는 쪽에서 판단)"""
+        row = self._connect().execute(
+            "SELECT payload, fetched_at, ttl FROM responses WHERE key = ?", (dump_key(key),)
+        ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(json.loads(row[0]), row[1], row[2])
+
+    def set(self, key, entry):
+        """항목 저장 (같은 키는 덮어씀)"""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, payload, fetched_at, ttl) VALUES (?, ?, ?, ?, ?)",
+                (dump_key(key), key[0], json.dumps(entry.value, ensure_ascii=False), entry.fetched_at, entry.ttl),
+            )
+
+    def fresh_entries(self, now=None, grace=0):
+        """만료되지 않았거나 만료 후 grace 초 이내인 (키, 항목) 목록 반환 (부팅 시 메모리 캐시 예열용)"""
+        now = time.time() if now is None else now
+        rows = self._connect().execute(
+            "SELECT key, payload, fetched_at, ttl FROM responses WHERE fetched_at + ttl + ? > ?", (grace, now)
+        ).fetchall()
+        return [(load_key(key), CacheEntry(json.loads(payload), fetched_at, ttl))
+                for key, payload, fetched_at, ttl in rows]
+
+    def compact(self, now=None):
+        """보관 기간이 지난 만료 행을 삭제하고 빈 페이지를 반환, 삭제한 행 수를 반환"""
+        now = time.time() if now is None else now
+        conn = self._connect()
+        with conn:
+            deleted = conn.execute(
+                "DELETE FROM responses WHERE fetched_at + ttl + ? < ?", (self.retention, now)
+            ).rowcount
+        if deleted:
+            conn.execute("PRAGMA incremental_vacuum")
+        return deleted
+
+    def start_compactor(self, interval=COMPACT_INTERVAL):
+        """백그라운드 정리 스레드 시작"""
+        if self._compactor is not None:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.compact()
+                except sqlite3.Error:
+                    # 다른 프로세스가 쓰기 잠금을 오래 잡고 있으면 다음 주기에 다시 시도
+                    pass
+
+        self._compactor = threading.Thread(target=run, name="weather-cache-compactor", daemon=True)
+        self._compactor.start()
+
+    def stop(self):
+        """정리 스레드 중지"""
+        self._stop.set()
@@ -0,0 +1,174 @@
+"""인기 도시 캐시 예열 스케줄러
+
+새 세션은 대부분 기본 도시나 빠른 선택 버튼의 도시로 시작하므로, 이 도시들과
+실제로 많이 조회된 상위 N개 도시의 현재 날씨/예보를 만료 전에 미리 가져와 첫
+조회도 캐시에서 바로 응답하게 합니다.
+
+- 키마다 고정된 오프셋으로 갱신 시각을 흩뿌려서 만료가 한꺼번에 몰리지 않습니다.
+- 최근 1분 동안의 업스트림 호출 수가 예산을 넘으면 남은 갱신은 다음 주기로 미룹니다.
+- 예열 요청은 백그라운드 우선순위로 보내므로, 전체 호출 한도가 부족하면 사용자 요청에
+  밀려 버려지고 역시 다음 주기로 미뤄집니다.
+"""
+import os
+import threading
+import time
+import zlib
+from collections import Counter, deque
+
+from weather.cache import make_key
+from weather.ratelimit import priority, RateLimitedError, BACKGROUND
+
+# 예열 사용 여부, 검사 주기(초), 관측 기반 상위 도시 수, 분당 업스트림 호출 예산
+PREWARM_ENABLED = os.getenv("WEATHER_PREWARM", "1") != "0"
+PREWARM_INTERVAL = float(os.getenv("WEATHER_PREWARM_INTERVAL", 15))
+PREWARM_TOP_N = int(os.getenv("WEATHER_PREWARM_TOP_N", 10))
+PREWARM_BUDGET = int(os.getenv("WEATHER_PREWARM_BUDGET_PER_MINUTE", 20))
+# TTL 대비 갱신 시점과, 키마다 갱신 시점을 앞당겨 흩뿌리는 폭
+PREWARM_AHEAD = float(os.getenv("WEATHER_PREWARM_AHEAD", 0.8))
+PREWARM_SPREAD = float(os.getenv("WEATHER_PREWARM_SPREAD", 0.15))
+# 실패한 키를 다시 시도하기까지 기다리는 시간 (초)
+RETRY_DELAY = 60
+PREWARM_ENDPOINTS = ('weather', 'forecast')
+
+
+class CityPopularity:
+    """도시명 조회 횟수를 세는 도우미 (최대 max_cities개 도시만 유지)"""
+
+    def __init__(self, max_cities=1000):
+        self.max_cities = max_cities
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, city):
+        with self._lock:
+            self._counts[city] += 1
+            if len(self._counts) > self.max_cities:
+                # 조회가 적은 도시부터 정리해서 메모리를 일정하게 유지
+                self._counts = Counter(dict(self._counts.most_common(self.max_cities // 2)))
+
+    def top(self, n):
+        """가장 많이 조회된 도시 n개를 반환"""
+        with self._lock:
+            return [city for city, _ in self._counts.most_common(n)]
+
+
+# 프로세스 전체가 공유하는 도시 조회 횟수
+city_popularity = CityPopularity()
+
+
+def _offset(key):
+    """키마다 고정된 0~1 사이 값 (재시작해도 같은 키는 같은 위치에 흩뿌려짐)"""
+    return zlib.crc32(repr(key).encode('utf-8')) / 0xFFFFFFFF
+
+
+class CachePrewarmer:
+    """고정 도시 목록 + 인기 도시의 캐시 항목을 만료 전에 다시 가져오는 스케줄러"""
+
+    def __init__(self, client, cities=(), top_n=PREWARM_TOP_N, budget_per_minute=PREWARM_BUDGET,
+                 interval=PREWARM_INTERVAL, ahead=PREWARM_AHEAD, spread=PREWARM_SPREAD,
+                 endpoints=PREWARM_ENDPOINTS, popularity=city_popularity):
+        self.client = client
+        self.cities = list(cities)
+        self.top_n = top_n
+        self.budget_per_minute = budget_per_minute
+        self.interval = interval
+        self.ahead = ahead
+        self.spread = spread
+        self.endpoints = endpoints
+        self.popularity = popularity
+        self.warmed = 0
+        self.failures = 0
+        self.deferred = 0
+        self._calls = deque()   # 최근 1분 동안의 업스트림 호출 시각
+        self._failed_at = {}    # key -> 마지막 실패 시각
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def hot_list(self):
+        """예열할 도시 목록 (고정 도시 다음에 많이 조회된 도시, 중복 제거)"""
+        observed = self.popularity.top(self.top_n) if self.popularity is not None else []
+        return list(dict.fromkeys(self.cities + observed))
+
+    def due_at(self, key, entry):
+        """키를 다시 가져올 시각 (캐시에 없으면 0, 즉 바로)"""
+        if entry is None:
+            return 0
+        return entry.fetched_at + entry.ttl * (self.ahead - self.spread * _offset(key))
+
+    def due(self, now=None):
+        """갱신할 (endpoint, 도시) 목록을 갱신 시각 순으로 반환"""
+        now = time.time() if now is None else now
+        items = []
+        for city in self.hot_list():
+            for endpoint in self.endpoints:
+                key = make_key(endpoint, {'q': city}, self.client.units, self.client.lang)
+                if now - self._failed_at.get(key, 0) < RETRY_DELAY:
+                    continue
+                due_at = self.due_at(key, self.client.cache.peek(key))
+                if due_at <= now:
+                    items.append((due_at, endpoint, city, key))
+        items.sort(key=lambda item: item[0])
+        return [(endpoint, city, key) for _, endpoint, city, key in items]
+
+    def _take_budget(self, now):
+        """분당 예산이 남아 있으면 호출 한 번을 기록하고 True 반환"""
+        with self._lock:
+            while self._calls and now - self._calls[0] >= 60:
+                self._calls.popleft()
+            if len(self._calls) >= self.budget_per_minute:
+                return False
+            self._calls.append(now)
+            return True
+
+    def run_once(self, now=None):
+        """한 번 검사해서 갱신할 항목을 예산 안에서 다시 가져오고, 가져온 수를 반환"""
+        now = time.time() if now is None else now
+        due = self.due(now)
+        warmed = 0
+        for index, (endpoint, city, key) in enumerate(due):
+            if not self._take_budget(now):
+                # 예산을 다 썼으면 나머지는 다음 주기로 미룸
+                self.deferred += len(due) - index
+                break
+            try:
+                with priority(BACKGROUND):
+                    self.client.refresh(endpoint, {'q': city})
+                warmed += 1
+            except RateLimitedError:
+                # 전체 호출 한도가 부족하면 사용자 요청을 위해 나머지를 다음 주기로 미룸
+                self.deferred += len(due) - index
+                break
+            except Exception:
+                self.failures += 1
+                self._failed_at[key] = now
+        self.warmed += warmed
+        return warmed
+
+    def start(self):
+        """주기적으로 예열하는 데몬 스레드 시작"""
+        if self._thread is not None:
+            return self
+
+        def run():
+            while not self._stop.wait(self.interval):
+                self.run_once()
+
+        self._thread = threading.Thread(target=run, name="weather-prewarmer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        with self._lock:
+            calls = sum(1 for called in self._calls if time.time() - called < 60)
+        return {
+            'cities': len(self.hot_list()),
+            'warmed': self.warmed,
+            'failures': self.failures,
+            'deferred': self.deferred,
+            'calls_last_minute': calls,
+            'budget_per_minute': self.budget_per_minute,
+        }
@@ -0,0 +1,259 @@
+"""업스트림 호출 속도 제한
+
+외부 API의 분당 호출 한도를 지키기 위한 토큰 버킷과, 그 앞에서 요청을 우선순위별로
+줄 세우는 제한기입니다.
+
+- ``TokenBucket``: 토큰은 분당 ``rate_per_minute`` 개의 속도로 채워지고 최대
+  ``capacity`` 개까지 쌓이므로, 잠깐 몰리는 요청은 허용하면서 평균 호출 속도는
+  한도를 넘지 않습니다.
+- ``SQLiteTokenBucket``: 같은 SQLite 파일을 쓰는 여러 워커 프로세스가 하나의 버킷을
+  나눠 씁니다 (``WEATHER_RATE_LIMIT_DB``).
+- ``PriorityLimiter``: 사용자 요청(INTERACTIVE)을 예열/갱신 같은 백그라운드 요청
+  (BACKGROUND)보다 먼저 처리하고, 남은 토큰이 적으면 백그라운드 요청은 기다리지 않고
+  버립니다.
+"""
+import contextlib
+import contextvars
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+import requests
+
+# 요청 우선순위 (작을수록 먼저 처리)
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# 업스트림 분당 호출 한도 (OpenWeather 무료 요금제 60회, 0 이면 제한 없음)와 순간 허용량
+UPSTREAM_RATE = int(os.getenv("WEATHER_UPSTREAM_RATE_PER_MINUTE", 60))
+UPSTREAM_BURST = int(os.getenv("WEATHER_UPSTREAM_BURST", 0)) or None
+# 백그라운드 요청을 위해 남겨두지 않을 토큰 비율 (남은 토큰이 이보다 적으면 백그라운드 요청을 버림)
+BACKGROUND_RESERVE = float(os.getenv("WEATHER_UPSTREAM_BACKGROUND_RESERVE", 0.25))
+# 우선순위별 최대 대기 시간 (초)
+MAX_WAIT = {
+    INTERACTIVE: float(os.getenv("WEATHER_UPSTREAM_MAX_WAIT", 5)),
+    BACKGROUND: float(os.getenv("WEATHER_UPSTREAM_BACKGROUND_MAX_WAIT", 30)),
+}
+# 여러 프로세스가 버킷을 공유할 SQLite 파일 (비어 있으면 프로세스 안에서만 공유)
+RATE_LIMIT_DB_PATH = os.getenv("WEATHER_RATE_LIMIT_DB", "")
+
+_priority = contextvars.ContextVar('weather_request_priority', default=INTERACTIVE)
+
+
+class RateLimitedError(requests.exceptions.RequestException):
+    """호출 한도를 다 써서 업스트림 요청을 보내지 않았을 때 발생하는 예외"""
+
+
+@contextlib.contextmanager
+def priority(level):
+    """이 블록 안에서 보내는 업스트림 요청의 우선순위를 지정 (예: 백그라운드 갱신)"""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority():
+    return _priority.get()
+
+
+class TokenBucket:
+    """스레드 안전한 토큰 버킷"""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate_per_minute = rate_per_minute
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.acquired = 0
+        self.rejected = 0
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _transact(self, update):
+        """토큰을 채운 뒤 update(tokens) -> (결과, 새 토큰 수) 를 원자적으로 적용"""
+        with self._lock:
+            now = time.monotonic()
+            tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_minute / 60)
+            result, self._tokens = update(tokens)
+            self._updated = now
+            return result
+
+    def try_acquire(self, tokens=1):
+        """토큰이 있으면 꺼내고 True, 없으면 False 반환 (기다리지 않음)"""
+        acquired = self._transact(lambda available: (True, available - tokens) if available >= tokens
+                                  else (False, available))
+        if acquired:
+            self.acquired += 1
+        else:
+            self.rejected += 1
+        return acquired
+
+    def drain(self):
+        """업스트림이 한도 초과를 알렸을 때 남은 토큰을 모두 버림"""
+        self._transact(lambda available: (None, 0.0))
+
+    def available(self):
+        """지금 꺼낼 수 있는 토큰 수"""
+        return self._transact(lambda available: (available, available))
+
+    def wait_time(self, tokens=1):
+        """토큰이 tokens개 쌓일 때까지 남은 시간 (초)"""
+        missing = tokens - self.available()
+        if missing <= 0:
+            return 0.0
+        return missing * 60 / self.rate_per_minute
+
+    def stats(self):
+        return {
+            'available': round(self.available(), 2),
+            'capacity': self.capacity,
+            'rate_per_minute': self.rate_per_minute,
+            'acquired': self.acquired,
+            'rejected': self.rejected,
+        }
+
+
+class SQLiteTokenBucket(TokenBucket):
+    """여러 워커 프로세스가 같은 SQLite 파일로 토큰을 나눠 쓰는 버킷"""
+
+    def __init__(self, path, rate_per_minute, capacity=None, name='upstream'):
+        super().__init__(rate_per_minute, capacity)
+        self.path = path
+        self.name = name
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute("CREATE TABLE IF NOT EXISTS token_buckets "
+                     "(name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)")
+        conn.execute("INSERT OR IGNORE INTO token_buckets VALUES (?, ?, ?)",
+                     (name, float(self.capacity), time.time()))
+
+    def _connect(self):
+        """스레드마다 별도의 연결을 사용 (sqlite3 연결은 스레드 간 공유 불가)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _transact(self, update):
+        # 프로세스 사이의 시각을 맞추기 위해 벽시계 시각을 사용하고, 쓰기 잠금을 먼저 잡음
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            tokens, updated = conn.execute(
+                "SELECT tokens, updated FROM token_buckets WHERE name = ?", (self.name,)).fetchone()
+            now = time.time()
+            tokens = min(self.capacity, tokens + max(0.0, now - updated) * self.rate_per_minute / 60)
+            result, tokens = update(tokens)
+            conn.execute("UPDATE token_buckets SET tokens = ?, updated = ? WHERE name = ?",
+                         (tokens, now, self.name))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return result
+
+
+class PriorityLimiter:
+    """토큰 버킷 앞에서 요청을 우선순위 순서로 기다리게 하는 제한기
+
+    대기열 맨 앞의 요청만 토큰을 가져갈 수 있으므로 사용자 요청은 먼저 들어와 있던
+    백그라운드 요청보다도 먼저 처리됩니다. 백그라운드 요청은 남은 토큰이 예비분
+    (capacity * reserve)보다 적거나 사용자 요청이 기다리고 있으면 바로 버려집니다.
+    """
+
+    def __init__(self, bucket, reserve=BACKGROUND_RESERVE, max_wait=None):
+        self.bucket = bucket
+        self.reserve = reserve
+        self.max_wait = dict(MAX_WAIT if max_wait is None else max_wait)
+        self.granted = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.shed = 0
+        self.timed_out = 0
+        self.retries = 0    # 전송 계층 재시도로 가져간 토큰 수
+        self._queue = []
+        self._sequence = itertools.count()
+        self._calls = deque()   # 최근 1분 동안 허가한 시각
+        self._cond = threading.Condition()
+
+    def _waiting(self, level):
+        return sum(1 for ticket in self._queue if ticket[0] == level)
+
+    def acquire(self, level=None, timeout=None):
+        """토큰 하나를 얻을 때까지 우선순위 순서로 기다림, 얻지 못하면 RateLimitedError"""
+        level = current_priority() if level is None else level
+        deadline = time.monotonic() + (self.max_wait.get(level, 0) if timeout is None else timeout)
+        with self._cond:
+            if level != INTERACTIVE and (self._waiting(INTERACTIVE)
+                                         or self.bucket.available() < self.bucket.capacity * self.reserve):
+                self.shed += 1
+                raise RateLimitedError("호출 한도가 부족해 백그라운드 요청을 건너뜁니다")
+            ticket = (level, next(self._sequence))
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    if self._queue[0] == ticket and self.bucket.try_acquire():
+                        self.granted[level] = self.granted.get(level, 0) + 1
+                        now = time.time()
+                        self._calls.append(now)
+                        self._trim_calls(now)
+                        return
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timed_out += 1
+                        raise RateLimitedError(f"호출 한도로 {self.max_wait.get(level, 0):g}초 안에 요청하지 못했습니다")
+                    wait = min(remaining, self.bucket.wait_time()) if self._queue[0] == ticket else remaining
+                    self._cond.wait(max(wait, 0.01))
+            finally:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+
+    def acquire_retry(self, level=None):
+        """전송 계층 재시도 한 번에 토큰 하나를 얻음 (얻지 못하면 RateLimitedError)"""
+        self.acquire(level)
+        with self._cond:
+            self.retries += 1
+
+    def _trim_calls(self, now):
+        while self._calls and now - self._calls[0] >= 60:
+            self._calls.popleft()
+
+    def stats(self):
+        with self._cond:
+            self._trim_calls(time.time())
+            return {
+                'available': round(self.bucket.available(), 1),
+                'capacity': self.bucket.capacity,
+                'rate_per_minute': self.bucket.rate_per_minute,
+                'used_last_minute': len(self._calls),
+                'queued': len(self._queue),
+                'granted_interactive': self.granted[INTERACTIVE],
+                'granted_background': self.granted[BACKGROUND],
+                'shed': self.shed,
+                'timed_out': self.timed_out,
+                'retries': self.retries,
+            }
+
+
+def limiter_from_env():
+    """환경 변수에 맞는 업스트림 제한기 생성 (한도가 0 이면 None)"""
+    if UPSTREAM_RATE <= 0:
+        return None
+    if RATE_LIMIT_DB_PATH:
+        bucket = SQLiteTokenBucket(RATE_LIMIT_DB_PATH, UPSTREAM_RATE, UPSTREAM_BURST)
+    else:
+        bucket = TokenBucket(UPSTREAM_RATE, UPSTREAM_BURST)
+    return PriorityLimiter(bucket)
+
+
+# 프로세스 전체가 공유하는 업스트림 제한기
+upstream_limiter = limiter_from_env()
@@ -0,0 +1,109 @@
+"""stale-while-revalidate 백그라운드 갱신기
+
+사용자가 보고 있는 위치의 캐시 항목을 TTL이 끝나기 전에 미리 갱신하고, TTL이 지난
+항목은 오래된 값을 먼저 돌려준 뒤 백그라운드에서 다시 가져옵니다. 그래서 API 호출
+횟수는 열린 탭 수가 아니라 TTL에 따라 정해집니다.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from weather.ratelimit import priority, BACKGROUND
+
+# 검사 주기, TTL 대비 선제 갱신 시점, 조회가 없으면 추적을 멈추는 시간 (초)
+REFRESH_INTERVAL = float(os.getenv("WEATHER_REFRESH_INTERVAL", 30))
+REFRESH_AHEAD = float(os.getenv("WEATHER_REFRESH_AHEAD", 0.8))
+ACTIVE_WINDOW = float(os.getenv("WEATHER_REFRESH_ACTIVE_WINDOW", 15 * 60))
+REFRESH_WORKERS = int(os.getenv("WEATHER_REFRESH_WORKERS", 4))
+
+
+class BackgroundRefresher:
+    """최근에 조회된 캐시 키를 추적하며 만료 전에 다시 가져오는 갱신기"""
+
+    def __init__(self, cache, interval=REFRESH_INTERVAL, refresh_ahead=REFRESH_AHEAD,
+                 active_window=ACTIVE_WINDOW, workers=REFRESH_WORKERS):
+        self.cache = cache
+        self.interval = interval
+        self.refresh_ahead = refresh_ahead
+        self.active_window = active_window
+        self.refreshes = 0
+        self.failures = 0
+        self._tracked = {}      # key -> (fetch, 마지막 조회 시각)
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="weather-refresh")
+        self._thread = None
+        self._stop = threading.Event()
+
+    def touch(self, key, fetch):
+        """키가 조회되었음을 기록 (fetch: 인자 없이 새 값을 가져와 캐시에 저장하는 함수)"""
+        with self._lock:
+            self._tracked[key] = (fetch, time.time())
+
+    def revalidate(self, key, fetch):
+        """키를 백그라운드에서 즉시 다시 가져옴 (이미 진행 중이면 무시)"""
+        with self._lock:
+            if key in self._in_flight:
+                return
+            self._in_flight.add(key)
+        self._executor.submit(self._refresh, key, fetch)
+
+    def _refresh(self, key, fetch):
+        try:
+            # 사용자가 이미 (오래된) 값을 받았으므로 호출 한도에서는 사용자 요청보다 뒤로 밀림
+            with priority(BACKGROUND):
+                fetch()
+            self.refreshes += 1
+        except Exception:
+            # 갱신에 실패하면 기존(오래된) 값을 계속 제공하고 다음 주기에 다시 시도
+            self.failures += 1
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
+
+    def due_keys(self, now=None):
+        """선제 갱신이 필요한 (키, fetch) 목록 반환, 오래 조회되지 않은 키는 추적 중단"""
+        now = time.time() if now is None else now
+        due = []
+        with self._lock:
+            for key, (fetch, last_access) in list(self._tracked.items()):
+                if now - last_access > self.active_window:
+                    del self._tracked[key]
+                    continue
+                entry = self.cache.peek(key)
+                if entry is None or now - entry.fetched_at >= entry.ttl * self.refresh_ahead:
+                    due.append((key, fetch))
+        return due
+
+    def run_once(self):
+        """한 번 검사해서 갱신이 필요한 키를 백그라운드로 갱신"""
+        due = self.due_keys()
+        for key, fetch in due:
+            self.revalidate(key, fetch)
+        return len(due)
+
+    def start(self):
+        """주기적으로 검사하는 데몬 스레드 시작"""
+        if self._thread is not None:
+            return self
+
+        def run():
+            while not self._stop.wait(self.interval):
+                self.run_once()
+
+        self._thread = threading.Thread(target=run, name="weather-refresher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'tracked': len(self._tracked),
+                'in_flight': len(self._in_flight),
+                'refreshes': self.refreshes,
+                'failures': self.failures,
+            }
@@ -0,0 +1,197 @@
+"""한국 행정구역 및 도시명 데이터
+
+행정구역(시/도 → 시/군/구 → 동/읍/면)은 버전이 붙은 데이터 파일
+``weather/data/korean_divisions.json`` 에 있으며, 프로세스당 한 번만 읽어서
+선택 목록과 ID 색인을 미리 만들어 둡니다. 앱은 매 rerun 마다 만들어진 튜플을
+그대로 사용하므로 동/읍/면 전체 목록으로 늘어나도 rerun 비용은 변하지 않습니다.
+
+모든 항목은 데이터 파일에 기록된 고정 정수 ID를 가집니다 (시/도 ``p``,
+시/군/구 ``p * 1000 + n``, 동/읍/면 ``시/군/구 ID * 1000 + n``). 항목을 추가할
+때는 기존 ID를 바꾸지 않고 새 번호를 붙입니다.
+
+버전 2부터 시/군/구는 청사 위치의 위도/경도(``lat``, ``lon``)를 가지며, 동/읍/면은
+``[id, 이름, lat, lon]`` 으로 자기 좌표를 가질 수 있습니다 (없으면 시/군/구 좌표 사용).
+그래서 행정구역 선택은 이름 검색 없이 좌표로 날씨를 조회합니다.
+"""
+import json
+import os
+from collections import namedtuple
+
+DIVISIONS_PATH = os.getenv(
+    "WEATHER_DIVISIONS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "korean_divisions.json"),
+)
+# 이 코드가 읽을 수 있는 데이터 파일 버전
+SUPPORTED_VERSIONS = (1, 2)
+
+Province = namedtuple('Province', ['id', 'name', 'cities'])
+City = namedtuple('City', ['id', 'province', 'name', 'english', 'query_name', 'lat', 'lon', 'districts'])
+District = namedtuple('District', ['id', 'city_id', 'name', 'lat', 'lon'])
+
+
+class KoreanDivisions:
+    """행정구역 데이터와 미리 계산된 색인
+
+    - ``provinces``: 시/도 이름 튜플 (선택 목록)
+    - ``cities(province)``, ``districts(province, city)``: 하위 선택 목록
+    - ``city(province, city)``: 시/군/구 항목 (영문명, API 조회용 이름, 좌표 포함)
+    - ``query_for(province, city, district)``: 날씨 조회 매개변수 (좌표 우선)
+    - ``by_id(id)``: ID로 시/도, 시/군/구, 동/읍/면 항목 조회
+    """
+
+    def __init__(self, data):
+        if data.get('version') not in SUPPORTED_VERSIONS:
+            raise ValueError(f"지원하지 않는 행정구역 데이터 버전입니다: {data.get('version')}")
+        self.version = data['version']
+        self._provinces = {}
+        self._cities = {}
+        self._by_id = {}
+        for province in data['provinces']:
+            cities = []
+            for raw in province['cities']:
+                lat, lon = raw.get('lat'), raw.get('lon')
+                districts = tuple(
+                    District(district[0], raw['id'], district[1], *(district[2:4] if len(district) >= 4 else (lat, lon)))
+                    for district in raw['districts']
+                )
+                city = City(raw['id'], province['name'], raw['name'], raw['english'],
+                            raw['english'].split(",")[0], lat, lon, districts)
+                cities.append(city)
+                self._cities[(province['name'], city.name)] = city
+                self._add(city)
+                for district in districts:
+                    self._add(district)
+            entry = Province(province['id'], province['name'], tuple(cities))
+            self._provinces[entry.name] = entry
+            self._add(entry)
+        self.provinces = tuple(self._provinces)
+        self._city_names = {name: tuple(city.name for city in p.cities) for name, p in self._provinces.items()}
+        self._district_names = {key: tuple(d.name for d in city.districts) for key, city in self._cities.items()}
+
+    def _add(self, entry):
+        if entry.id in self._by_id:
+            raise ValueError(f"행정구역 ID가 중복되었습니다: {entry.id}")
+        self._by_id[entry.id] = entry
+
+    def cities(self, province):
+        """시/도에 속한 시/군/구 이름 튜플"""
+        return self._city_names.get(province, ())
+
+    def districts(self, province, city):
+        """시/군/구에 속한 동/읍/면 이름 튜플"""
+        return self._district_names.get((province, city), ())
+
+    def city(self, province, city):
+        """시/군/구 항목 (없으면 None)"""
+        return self._cities.get((province, city))
+
+    def query_for(self, province, city, district=None):
+        """날씨 조회 매개변수 (좌표가 있으면 {'lat', 'lon'}, 없으면 영문명 {'q'})"""
+        entry = self._cities.get((province, city))
+        if entry is None:
+            return None
+        if district is not None:
+            entry = next((d for d in entry.districts if d.name == district), entry)
+        if entry.lat is None or entry.lon is None:
+            return {'q': self._cities[(province, city)].query_name}
+        return {'lat': entry.lat, 'lon': entry.lon}
+
+    def all_cities(self):
+        """모든 시/군/구 항목"""
+        return tuple(self._cities.values())
+
+    def by_id(self, entry_id):
+        """ID에 해당하는 항목 (없으면 None)"""
+        return self._by_id.get(entry_id)
+
+    def __len__(self):
+        return len(self._by_id)
+
+
+def load_divisions(path=DIVISIONS_PATH):
+    """데이터 파일을 읽어 KoreanDivisions 를 만드는 함수"""
+    with open(path, encoding='utf-8') as f:
+        return KoreanDivisions(json.load(f))
+
+
+# 프로세스 전체가 공유하는 행정구역 데이터 (이 모듈을 처음 불러올 때 한 번 로드)
+korean_divisions = load_divisions()
+
+# 빠른 도시 검색을 위한 간단한 매핑
+SIMPLE_CITY_MAPPING = {
+    # 특별시/광역시
+    "서울": "Seoul",
+    "부산": "Busan",
+    "인천": "Incheon", 
+    "대구": "Daegu",
+    "대전": "Daejeon",
+    "광주": "Gwangju",
+    "울산": "Ulsan",
+    "세종": "Sejong",
+    
+    # 경기도 주요 도시
+    "수원": "Suwon",
+    "성남": "Seongnam",
+    "고양": "Goyang",
+    "용인": "Yongin",
+    "부천": "Bucheon",
+    "안산": "Ansan",
+    "안양": "Anyang",
+    "남양주": "Namyangju",
+    "화성": "Hwaseong",
+    "평택": "Pyeongtaek",
+    "의정부": "Uijeongbu",
+    "시흥": "Siheung",
+    "파주": "Paju",
+    "광명": "Gwangmyeong",
+    "김포": "Gimpo",
+    "군포": "Gunpo",
+    "하남": "Hanam",
+    "오산": "Osan",
+    "이천": "Icheon",
+    "안성": "Anseong",
+    "의왕": "Uiwang",
+    "구리": "Guri",
+    "양주": "Yangju",
+    "동두천": "Dongducheon",
+    "과천": "Gwacheon",
+    "여주": "Yeoju",
+    "포천": "Pocheon",
+    
+    # 강원도
+    "춘천": "Chuncheon",
+    "원주": "Wonju",
+    "강릉": "Gangneung",
+    "동해": "Donghae",
+    "속초": "Sokcho",
+    
+    # 충청도
+    "청주": "Cheongju",
+    "충주": "Chungju",
+    "제천": "Jecheon",
+    "천안": "Cheonan",
+    "공주": "Gongju",
+    "보령": "Boryeong",
+    
+    # 전라도
+    "전주": "Jeonju",
+    "군산": "Gunsan",
+    "익산": "Iksan",
+    "목포": "Mokpo",
+    "여수": "Yeosu",
+    "순천": "Suncheon",
+    
+    # 경상도
+    "포항": "Pohang",
+    "경주": "Gyeongju",
+    "안동": "Andong",
+    "구미": "Gumi",
+    "창원": "Changwon",
+    "진주": "Jinju",
+    "통영": "Tongyeong",
+    "사천": "Sacheon",
+    
+    # 제주도
+    "제주": "Jeju",
+    "서귀포": "Seogwipo"
+}
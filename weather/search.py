@@ -0,0 +1,193 @@
+"""한글/영문 지명 검색 색인
+
+간단한 도시명 매핑(``SIMPLE_CITY_MAPPING``), 한국 행정구역, 빠른 선택 도시를 하나의
+메모리 색인으로 묶어서 입력한 도시명을 API를 호출하기 전에 정해진 위치로 바꿉니다.
+
+- 정규화한 키(소문자, 공백/기호/악센트 제거)의 정렬 목록으로 접두어 검색
+- 한글 초성 키로 초성 검색 (예: ``ㄱㄴ`` → 강남구)
+- 글자 2-gram 색인으로 후보를 좁힌 뒤 Dice 유사도/편집 거리로 오타 검색
+  (예: ``Seuol`` → Seoul)
+
+색인은 이 모듈을 처음 불러올 때 한 번 만들어지며, 검색은 보통 1ms 안에 끝납니다.
+"""
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import namedtuple
+
+# 오타 검색 결과로 인정할 최소 유사도 (0~1)
+MIN_SIMILARITY = 0.6
+# resolve()가 오타 검색 결과를 그대로 확정할 최소 유사도
+RESOLVE_SIMILARITY = 0.75
+# 오타 검색에서 유사도를 계산할 최대 후보 수 (2-gram 이 많이 겹치는 순)
+MAX_CANDIDATES = 64
+
+# name: 표시 이름, label: 선택 목록에 보여줄 설명, kind: city/division/district/world,
+# query: 날씨 조회에 사용할 매개변수
+Place = namedtuple('Place', ['name', 'label', 'kind', 'query'])
+
+# 같은 점수일 때 먼저 보여줄 종류
+_KIND_ORDER = {'city': 0, 'world': 1, 'division': 2, 'district': 3}
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_IGNORED = re.compile(r"[\s\-_,.'’()]+")
+
+
+def normalize(text):
+    """검색 키 정규화 (소문자, 공백/기호 제거, 라틴 문자 악센트 제거, 한글은 그대로)"""
+    text = unicodedata.normalize('NFKD', text.strip().lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _IGNORED.sub("", unicodedata.normalize('NFC', text))
+
+
+def choseong(text):
+    """한글 음절을 초성으로 바꾼 문자열 (한글이 아닌 글자는 제외)"""
+    return "".join(_CHOSEONG[(ord(ch) - 0xAC00) // 588] for ch in text if '가' <= ch <= '힣')
+
+
+def edit_distance(a, b):
+    """인접 글자 바꿈을 한 번의 편집으로 세는 편집 거리 (optimal string alignment)"""
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[len(b)]
+
+
+def _grams(key):
+    """앞뒤 경계 표시를 붙인 2-gram 집합"""
+    padded = f"^{key}$"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+class PlaceIndex:
+    """지명 접두어/초성/오타 검색 색인"""
+
+    def __init__(self, places_with_keys):
+        self.places = []
+        entries = []
+        for place, keys in places_with_keys:
+            index = len(self.places)
+            self.places.append(place)
+            for key in {normalize(key) for key in keys if key}:
+                if key:
+                    entries.append((key, index))
+        entries.sort(key=lambda entry: (entry[0], _KIND_ORDER[self.places[entry[1]].kind]))
+        self._keys = [key for key, _ in entries]
+        self._owners = [index for _, index in entries]
+        # 2-gram → 키 위치 목록, 키별 2-gram 수
+        self._gram_postings = {}
+        self._gram_counts = []
+        for position, key in enumerate(self._keys):
+            grams = _grams(key)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._gram_postings.setdefault(gram, []).append(position)
+
+    def __len__(self):
+        return len(self.places)
+
+    def _prefix_positions(self, key):
+        position = bisect_left(self._keys, key)
+        while position < len(self._keys) and self._keys[position].startswith(key):
+            yield position
+            position += 1
+
+    def _scored(self, key):
+        """{장소 위치: 점수} (정확히 일치 2, 접두어 1~2, 오타 검색은 유사도 0~1)"""
+        scores = {}
+
+        def offer(position, score):
+            owner = self._owners[position]
+            if score > scores.get(owner, 0):
+                scores[owner] = score
+
+        for position in self._prefix_positions(key):
+            match = self._keys[position]
+            offer(position, 2.0 if match == key else 1.0 + len(key) / len(match))
+        if scores:
+            return scores
+
+        # 접두어로 찾지 못했으면 2-gram 이 절반 이상 겹치는 키만 유사도를 계산
+        grams = _grams(key)
+        overlap = {}
+        for gram in grams:
+            for position in self._gram_postings.get(gram, ()):
+                overlap[position] = overlap.get(position, 0) + 1
+        required = max(2, len(grams) // 2)
+        candidates = sorted((item for item in overlap.items() if item[1] >= required),
+                            key=lambda item: -item[1])[:MAX_CANDIDATES]
+        for position, common in candidates:
+            match = self._keys[position]
+            similarity = 2 * common / (len(grams) + self._gram_counts[position])
+            # 글자 바꿈 같은 짧은 오타는 2-gram 이 많이 깨지므로 길이가 비슷하면 편집 거리도 확인
+            if abs(len(match) - len(key)) <= 2:
+                longest = max(len(match), len(key))
+                similarity = max(similarity, 1 - edit_distance(key, match) / longest)
+            if similarity >= MIN_SIMILARITY:
+                offer(position, similarity)
+        return scores
+
+    def _ranked(self, text):
+        key = normalize(text)
+        if not key:
+            return []
+        scores = self._scored(key)
+        ranked = sorted(scores.items(),
+                        key=lambda item: (-item[1], _KIND_ORDER[self.places[item[0]].kind],
+                                          len(self.places[item[0]].name)))
+        return [(self.places[index], score) for index, score in ranked]
+
+    def search(self, text, limit=8):
+        """입력에 맞는 장소를 점수 순으로 최대 limit개 반환 (자동 완성용)"""
+        return [place for place, _ in self._ranked(text)[:limit]]
+
+    def resolve(self, text):
+        """입력을 하나의 장소로 확정 (정확히 일치하거나 충분히 비슷한 장소가 없으면 None)"""
+        ranked = self._ranked(text)
+        if not ranked:
+            return None
+        place, score = ranked[0]
+        if len(ranked) > 1 and ranked[1][1] == score and ranked[1][0].query != place.query:
+            # 여러 지역의 "중구"처럼 같은 점수의 다른 위치가 있으면 사용자가 고르도록 함
+            return None
+        if score >= 2.0 or (score < 1.0 and score >= RESOLVE_SIMILARITY):
+            return place
+        return None
+
+
+def build_place_index():
+    """간단한 도시명 매핑, 한국 행정구역, 빠른 선택 도시로 색인을 만드는 함수"""
+    from weather.cities import CITY_IDS, QUICK_SELECT_CITIES
+    from weather.regions import SIMPLE_CITY_MAPPING, korean_divisions
+
+    entries = []
+    for korean, english in SIMPLE_CITY_MAPPING.items():
+        place = Place(english, f"{korean} ({english})", 'city', {'q': english})
+        entries.append((place, [korean, english, choseong(korean)]))
+
+    for city in korean_divisions.all_cities():
+        place = Place(city.name, f"{city.name} · {city.province} ({city.english})", 'division',
+                      korean_divisions.query_for(city.province, city.name))
+        entries.append((place, [city.name, city.english, city.query_name, choseong(city.name)]))
+        for district in city.districts:
+            entries.append((Place(district.name, f"{district.name} · {city.province} {city.name}", 'district',
+                                  korean_divisions.query_for(city.province, city.name, district.name)),
+                            [district.name, choseong(district.name)]))
+
+    flags = {name: flag for cities in QUICK_SELECT_CITIES.values() for _, name, flag in cities}
+    known = set(SIMPLE_CITY_MAPPING.values())
+    for name in dict.fromkeys(list(flags) + list(CITY_IDS)):
+        if name in known:
+            continue
+        label = f"{flags[name]} {name}" if name in flags else name
+        entries.append((Place(name, label, 'world', {'q': name}), [name]))
+    return PlaceIndex(entries)
+
+
+# 프로세스 전체가 공유하는 지명 색인 (이 모듈을 처음 불러올 때 한 번 생성)
+place_index = build_place_index()
@@ -0,0 +1,114 @@
+"""프로세스 전체가 공유하는 HTTP 세션
+
+매 요청마다 새 TCP/TLS 연결을 여는 ``requests.get`` 대신 연결 풀을 재사용하고,
+모든 요청에 연결/읽기 타임아웃과 지터가 섞인 지수 백오프 재시도를 적용합니다.
+
+호출 한도 뒤에서 보내는 요청은 ``retry_hook`` 으로 재시도마다 토큰을 받게 합니다.
+이 경우 429 응답은 세션에서 재시도하지 않고 호출한 쪽(한도 관리자)에 바로 돌려줍니다.
+"""
+import contextlib
+import contextvars
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError
+from urllib3.util.retry import Retry
+
+# 연결 풀 크기 (호스트당 유지할 최대 연결 수)
+POOL_SIZE = int(os.getenv("WEATHER_HTTP_POOL_SIZE", 20))
+
+# 연결/읽기 타임아웃 (초)
+CONNECT_TIMEOUT = float(os.getenv("WEATHER_HTTP_CONNECT_TIMEOUT", 3.05))
+READ_TIMEOUT = float(os.getenv("WEATHER_HTTP_READ_TIMEOUT", 10))
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+# 429/5xx 응답 재시도 설정 (대기 시간: BACKOFF_FACTOR * 2^n + 0~BACKOFF_JITTER 초)
+MAX_RETRIES = int(os.getenv("WEATHER_HTTP_MAX_RETRIES", 3))
+# 연결 실패 재시도 횟수. 읽기 시간 초과는 재시도하지 않음 (느린 업스트림에 읽기 타임아웃을
+# 여러 번 기다리면 한 호출이 배치 마감 시간을 넘겨 작업 스레드를 붙잡으므로)
+CONNECT_RETRIES = int(os.getenv("WEATHER_HTTP_CONNECT_RETRIES", 1))
+BACKOFF_FACTOR = 0.5
+BACKOFF_JITTER = 0.5
+BACKOFF_MAX = 8
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+_retry_hook = contextvars.ContextVar('weather_retry_hook', default=None)
+
+
+@contextlib.contextmanager
+def retry_hook(fn):
+    """블록 안에서 보낸 요청이 재시도될 때마다 fn()을 먼저 호출 (429 응답은 재시도하지 않음)
+
+    fn 이 예외를 발생시키면 재시도를 멈추고 마지막 응답(또는 연결 오류)을 그대로 돌려줍니다.
+    """
+    token = _retry_hook.set(fn)
+    try:
+        yield
+    finally:
+        _retry_hook.reset(token)
+
+
+class HookedRetry(Retry):
+    """현재 컨텍스트의 retry_hook 을 재시도마다 호출하는 재시도 정책"""
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if status_code == 429 and _retry_hook.get() is not None:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        hook = _retry_hook.get()
+        if hook is not None:
+            try:
+                hook()
+            except Exception as e:
+                raise MaxRetryError(_pool, url, e) from e
+        return retry
+
+
+def build_session(pool_size=POOL_SIZE, max_retries=MAX_RETRIES):
+    """연결 풀과 재시도 정책이 설정된 새 세션을 만드는 함수"""
+    retry = HookedRetry(
+        total=max_retries,
+        connect=min(CONNECT_RETRIES, max_retries),
+        read=0,
+        other=0,
+        status=max_retries,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({'GET'}),
+        backoff_factor=BACKOFF_FACTOR,
+        backoff_jitter=BACKOFF_JITTER,
+        backoff_max=BACKOFF_MAX,
+        # 서버가 보낸 Retry-After 만큼 스크립트 스레드를 재우지 않도록 백오프만 사용
+        respect_retry_after_header=False,
+        # 재시도를 모두 소진하면 마지막 응답을 돌려주고 raise_for_status()에서 처리
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                          max_retries=retry, pool_block=False)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session():
+    """프로세스 공유 세션을 반환 (처음 호출할 때 생성)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def get_json(url, params=None, timeout=DEFAULT_TIMEOUT):
+    """공유 세션으로 GET 요청을 보내고 JSON 응답을 반환하는 함수"""
+    response = get_session().get(url, params=params, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
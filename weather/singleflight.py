@@ -0,0 +1,70 @@
+"""동일한 요청의 단일 비행(single-flight) 병합
+
+여러 세션이 같은 순간 같은 도시를 요청하면(기본 도시 "Seoul" 로 첫 화면이 열리거나
+캐시가 막 만료된 직후) 업스트림 호출은 하나만 보내고, 나머지 요청은 그 결과를
+함께 받습니다.
+"""
+import threading
+
+
+class _Call:
+    """진행 중인 호출 하나"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """키별로 동시에 하나의 호출만 실행하고 결과를 공유하는 병합기"""
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """같은 key 로 진행 중인 호출이 있으면 그 결과를 기다리고, 없으면 fn()을 실행"""
+        with self._lock:
+            call = self._in_flight.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._in_flight[key] = _Call()
+                self.calls += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+
+    def stats(self):
+        """실제 호출 수와 병합된 요청 수"""
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._in_flight),
+            }
+
+
+# 프로세스 전체가 공유하는 업스트림 호출 병합기
+upstream_flights = SingleFlight()
@@ -0,0 +1,135 @@
+"""재실행 단위 구간(span) 추적
+
+Streamlit 은 사용자 조작마다 ``main()`` 을 처음부터 다시 실행하므로, 어떤 단계가 그
+재실행의 시간을 차지하는지 보려면 재실행 하나를 단위로 구간을 모아야 합니다.
+
+- ``trace_rerun()`` 으로 재실행 하나의 추적을 시작하면, 그 안에서 ``span(name)`` 으로
+  감싼 구간의 시작 시각과 길이가 기록됩니다. 추적 중이 아니면 ``span`` 은 아무것도 하지
+  않으므로 공용 모듈(클라이언트, 예보 파싱, figure 생성)에 그대로 두어도 됩니다.
+- 현재 추적은 ``contextvars`` 로 전달되므로 병렬 배치의 작업 스레드에서 기록한 구간도
+  같은 재실행에 모입니다 (``weather.parallel`` 이 컨텍스트를 복사해서 실행).
+- ``SpanHistory`` 는 세션의 최근 재실행들을 모아 구간별 백분위수를 계산합니다.
+"""
+import contextlib
+import contextvars
+import functools
+import threading
+import time
+from collections import deque, namedtuple
+
+# 보관할 최근 재실행 수
+HISTORY_SIZE = 50
+
+# name: 구간 이름, start: 재실행 시작부터의 시작 시각 (초), duration: 길이 (초),
+# depth: 중첩 깊이, thread: 기록한 스레드 이름
+Span = namedtuple('Span', ['name', 'start', 'duration', 'depth', 'thread'])
+
+_current = contextvars.ContextVar('weather_trace', default=None)
+_depth = contextvars.ContextVar('weather_span_depth', default=0)
+
+
+class Trace:
+    """재실행 하나에서 기록된 구간 목록"""
+
+    def __init__(self, name='rerun'):
+        self.name = name
+        self.started = time.perf_counter()
+        self.duration = None
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, span_):
+        with self._lock:
+            self.spans.append(span_)
+
+    def elapsed(self):
+        """재실행 전체 길이 (아직 끝나지 않았으면 지금까지의 시간)"""
+        return self.duration if self.duration is not None else time.perf_counter() - self.started
+
+    def finished_spans(self):
+        """시작 시각 순으로 정렬한 구간 목록"""
+        with self._lock:
+            return sorted(self.spans, key=lambda item: (item.start, item.depth))
+
+
+def current_trace():
+    return _current.get()
+
+
+@contextlib.contextmanager
+def trace_rerun(name='rerun'):
+    """재실행 하나의 추적을 시작 (블록 안의 span 이 이 추적에 기록됨)"""
+    trace = Trace(name)
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        trace.duration = time.perf_counter() - trace.started
+        _current.reset(token)
+
+
+@contextlib.contextmanager
+def span(name):
+    """현재 추적에 구간 하나를 기록 (추적 중이 아니면 아무것도 하지 않음)"""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    depth = _depth.get()
+    token = _depth.set(depth + 1)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _depth.reset(token)
+        trace.add(Span(name, started - trace.started, time.perf_counter() - started, depth,
+                       threading.current_thread().name))
+
+
+def traced(name):
+    """함수 실행을 구간으로 기록하는 데코레이터"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def percentile(values, q):
+    """정렬된 값 목록의 q 백분위수 (선형 보간)"""
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class SpanHistory:
+    """세션의 최근 재실행에서 구간별 길이를 모으는 도우미"""
+
+    def __init__(self, maxlen=HISTORY_SIZE):
+        self.maxlen = maxlen
+        self._durations = {}    # 구간 이름 -> 최근 길이 deque
+        self.reruns = 0
+
+    def record(self, trace):
+        """끝난 재실행의 구간 길이를 추가 (같은 이름의 구간은 재실행마다 합산)"""
+        totals = {trace.name: trace.elapsed()}
+        for item in trace.finished_spans():
+            totals[item.name] = totals.get(item.name, 0.0) + item.duration
+        for name, duration in totals.items():
+            self._durations.setdefault(name, deque(maxlen=self.maxlen)).append(duration)
+        self.reruns += 1
+
+    def percentiles(self, quantiles=(50, 90, 99)):
+        """{구간 이름: {'count': n, 'p50': 초, ...}} (길이 중앙값이 큰 순)"""
+        rows = {}
+        for name, durations in self._durations.items():
+            ordered = sorted(durations)
+            row = {'count': len(ordered)}
+            row.update((f"p{q}", percentile(ordered, q)) for q in quantiles)
+            rows[name] = row
+        return dict(sorted(rows.items(), key=lambda item: -item[1]['p50']))
@@ -0,0 +1,196 @@
+"""응답 → 화면용 뷰 모델 변환 (Streamlit 을 사용하지 않는 순수 데이터 계층)
+
+두 앱은 원래 렌더링 함수 안에서 응답 dict 를 직접 읽고, 데이터를 가져오는 함수가
+``st.error`` 를 호출했습니다. 이 모듈은 응답을 정해진 필드의 뷰 모델로 바꾸고
+가져오기 실패를 값으로 돌려주므로, 앱은 뷰 모델을 그리기만 하면 됩니다.
+
+- ``current_conditions(payload)``: 현재 날씨 응답 → ``CurrentConditions``
+- ``forecast_summary(payload)``: 예보 응답 → ``ForecastSummary`` (3시간 간격 프레임, 일별 요약)
+- ``load_report(client, query)``: 현재 날씨와 예보를 함께 가져와 ``WeatherReport`` 로 반환
+- ``load_overview(client, names)``: 여러 도시의 ``CurrentConditions`` (실패한 도시는 예외)
+
+캐시된 응답은 모든 세션이 같은 dict 객체를 공유하므로 뷰 모델도 응답 객체별로 한 번만
+계산해 두고 함께 사용합니다 (반환값은 수정하지 말 것). pandas 를 쓰는 예보 변환은
+처음 필요할 때 불러옵니다.
+"""
+from collections import namedtuple
+from datetime import datetime
+
+from weather.breaker import payload_age
+from weather.cache import PayloadMemo
+from weather.figures import payload_digest
+
+# 뷰 모델을 보관할 응답 객체 수
+VIEW_CACHE_SIZE = 256
+
+ICON_URL = "http://openweathermap.org/img/wn/{icon}@{scale}x.png"
+
+# 날씨 아이콘 코드 → 이모지
+ICON_EMOJI = {
+    '01d': '☀️',  # clear sky day
+    '01n': '🌙',  # clear sky night
+    '02d': '⛅',  # few clouds day
+    '02n': '☁️',  # few clouds night
+    '03d': '☁️',  # scattered clouds
+    '03n': '☁️',
+    '04d': '☁️',  # broken clouds
+    '04n': '☁️',
+    '09d': '🌧️',  # shower rain
+    '09n': '🌧️',
+    '10d': '🌦️',  # rain day
+    '10n': '🌧️',  # rain night
+    '11d': '⛈️',  # thunderstorm
+    '11n': '⛈️',
+    '13d': '❄️',  # snow
+    '13n': '❄️',
+    '50d': '🌫️',  # mist
+    '50n': '🌫️'
+}
+
+# 일출/일몰 시각 (서버 현지 시각 datetime)
+SunTimes = namedtuple('SunTimes', ['sunrise', 'sunset'])
+
+# 현재 날씨 (visibility_km 은 응답에 없으면 None, age 는 마지막 정상 응답이면 몇 초 전 데이터인지)
+CurrentConditions = namedtuple('CurrentConditions', [
+    'city', 'country', 'temp', 'feels_like', 'humidity', 'pressure', 'description', 'icon',
+    'emoji', 'wind_speed', 'visibility_km', 'sun', 'age',
+])
+
+# 일별 요약 하루치 (day: 해당 날짜 0시, date: '%m/%d', weekday: '월'~'일')
+DailySummary = namedtuple('DailySummary', [
+    'day', 'date', 'weekday', 'min_temp', 'max_temp', 'avg_temp', 'humidity', 'wind_speed',
+    'description', 'icon', 'emoji',
+])
+
+# 예보 (cache_key: 응답 내용 해시, hourly: 3시간 간격 데이터프레임, daily: DailySummary 튜플, age: 위와 같음)
+ForecastSummary = namedtuple('ForecastSummary', ['cache_key', 'hourly', 'daily', 'age'])
+
+# 현재 날씨와 예보를 함께 가져온 결과 (errors: {'weather'/'forecast': 예외})
+WeatherReport = namedtuple('WeatherReport', ['current', 'forecast', 'errors'])
+
+
+def icon_url(icon, scale=2):
+    """OpenWeather 날씨 아이콘 이미지 주소"""
+    return ICON_URL.format(icon=icon, scale=scale)
+
+
+def icon_emoji(icon):
+    """날씨 아이콘 코드에 따른 이모지 반환"""
+    return ICON_EMOJI.get(icon, '🌤️')
+
+
+def temperature_emoji(temp):
+    """온도 구간별 이모지"""
+    if temp >= 30:
+        return "🔥"
+    if temp >= 20:
+        return "☀️"
+    if temp >= 10:
+        return "🌤️"
+    return "❄️"
+
+
+def humidity_level(humidity):
+    return '높음' if humidity > 70 else '보통' if humidity > 40 else '낮음'
+
+
+def wind_level(wind_speed):
+    return '강함' if wind_speed > 10 else '보통' if wind_speed > 5 else '약함'
+
+
+def pressure_level(pressure):
+    return '높음' if pressure > 1013 else '보통' if pressure > 1000 else '낮음'
+
+
+def visibility_level(visibility_km):
+    """가시거리 등급 (가시거리 정보가 없으면 None)"""
+    if visibility_km is None:
+        return None
+    return '좋음' if visibility_km > 10 else '보통' if visibility_km > 5 else '나쁨'
+
+
+def sun_times(payload):
+    """현재 날씨 응답의 일출/일몰 시각"""
+    sys_info = payload['sys']
+    return SunTimes(datetime.fromtimestamp(sys_info['sunrise']), datetime.fromtimestamp(sys_info['sunset']))
+
+
+def build_current(payload):
+    """현재 날씨 응답 하나에 대한 CurrentConditions 를 계산"""
+    main = payload['main']
+    condition = payload['weather'][0]
+    visibility = payload.get('visibility')
+    return CurrentConditions(
+        city=payload['name'],
+        country=payload['sys']['country'],
+        temp=main['temp'],
+        feels_like=main['feels_like'],
+        humidity=main['humidity'],
+        pressure=main['pressure'],
+        description=condition['description'],
+        icon=condition['icon'],
+        emoji=icon_emoji(condition['icon']),
+        wind_speed=payload['wind']['speed'],
+        visibility_km=visibility / 1000 if visibility is not None else None,
+        sun=sun_times(payload),
+        age=payload_age(payload),
+    )
+
+
+def build_forecast(payload):
+    """예보 응답 하나에 대한 ForecastSummary 를 계산"""
+    from weather.forecast import forecast_view
+
+    view = forecast_view(payload)
+    daily = tuple(
+        DailySummary(emoji=icon_emoji(record['icon']), **record)
+        for record in view.daily_records
+    )
+    return ForecastSummary(payload_digest(payload), view.hourly, daily, payload_age(payload))
+
+
+_current = PayloadMemo(VIEW_CACHE_SIZE)
+_forecasts = PayloadMemo(VIEW_CACHE_SIZE)
+
+
+def current_conditions(payload):
+    """현재 날씨 응답의 CurrentConditions (응답 객체당 한 번만 계산)"""
+    return _current.get_or_compute(payload, build_current)
+
+
+def forecast_summary(payload):
+    """예보 응답의 ForecastSummary (응답 객체당 한 번만 계산)"""
+    return _forecasts.get_or_compute(payload, build_forecast)
+
+
+def data_age(*views):
+    """뷰 모델 중 마지막 정상 응답으로 만든 것이 있으면 가장 오래된 나이 (초), 없으면 None"""
+    ages = [view.age for view in views if view is not None and view.age is not None]
+    return max(ages) if ages else None
+
+
+def load_report(client, query):
+    """현재 날씨와 5일 예보를 하나의 병렬 배치로 가져와 WeatherReport 로 반환
+
+    실패한 요청은 예외를 errors 에 담아 돌려주고, 도시를 찾지 못한 응답(cod != 200)은
+    current 를 None 으로 둡니다.
+    """
+    # 같은 배치에 엔드포인트를 추가하면 함께 병렬로 요청됩니다
+    results = client.fetch_many({
+        'weather': ('weather', query),
+        'forecast': ('forecast', query),
+    })
+    errors = {name: result for name, result in results.items() if isinstance(result, Exception)}
+
+    weather = results['weather'] if 'weather' not in errors else None
+    forecast = results['forecast'] if 'forecast' not in errors else None
+    current = current_conditions(weather) if weather and weather.get('cod', 200) == 200 else None
+    return WeatherReport(current, forecast_summary(forecast) if forecast else None, errors)
+
+
+def load_overview(client, city_names):
+    """여러 도시의 현재 날씨를 한 번의 배치로 가져와 {도시명: CurrentConditions 또는 예외}로 반환"""
+    return {
+        name: result if isinstance(result, Exception) else current_conditions(result)
+        for name, result in client.current_many(city_names).items()
+    }